@@ -258,6 +258,36 @@ def get_dictlist_from_model(model, spec, **kwargs):
     return result
 
 
+def iter_dictlist_from_model(model, spec, chunk_size=1000, **kwargs):
+    """Same as get_dictlist_from_model, but reads records by chunks.
+    Records are searched at once, but only one chunk of records is read and
+    kept in the cache at a time, so memory usage doesn't depend on the number
+    of records.
+    :param str model: The model against which to validate.
+    :param tuple spec: The spec to validate.
+    :param int chunk_size: Number of records to read at once.
+    :param dict kwargs: Keyword arguments of get_dictlist_from_model.
+    :returns: Generator of python dictionaries of the requested values.
+    :rtype: generator
+    """
+    model_obj = get_model_for_read(model, kwargs.get("env", False))
+    ids = (
+        model_obj.sudo()
+        .search(
+            kwargs.get("domain", []),
+            offset=kwargs.get("offset", 0),
+            limit=kwargs.get("limit"),
+            order=kwargs.get("order"),
+        )
+        .ids
+    )
+    chunk_kwargs = dict(kwargs, offset=0, limit=None)
+    for i in range(0, len(ids), chunk_size):
+        chunk_kwargs["domain"] = [("id", "in", ids[i : i + chunk_size])]
+        yield from get_dictlist_from_model(model, spec, **chunk_kwargs)
+        model_obj.env.invalidate_all()
+
+
 # Get a model with special context
 def get_model_for_read(model, ENV=False):
     """Fetch a model object from the environment optimized for read.
@@ -43,6 +43,31 @@ class Base(models.AbstractModel):
         )
         return result
 
+    @api.model
+    def _search_read_nested_iter(
+        self,
+        domain=None,
+        fields=None,
+        offset=0,
+        limit=None,
+        order=None,
+        delimeter="/",
+        chunk_size=1000,
+    ):
+        """Same as search_read_nested, but returns generator, which reads records
+        by chunks"""
+        return pinguin.iter_dictlist_from_model(
+            self._name,
+            tuple(fields),
+            chunk_size=chunk_size,
+            domain=domain or [],
+            offset=offset,
+            limit=limit,
+            order=order,
+            env=self.env,
+            delimeter=delimeter,
+        )
+
     @api.model
     def create_or_update_by_external_id(self, vals):
         ext_id = vals.get("id")
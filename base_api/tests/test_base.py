@@ -140,6 +140,14 @@ class TestBase(TransactionCase):
         )
         # (1) records has requested values
         self.assertEqual(correct_result, record_list)
+        # (2) reading by chunks returns the same values
+        record_iter = partner_obj._search_read_nested_iter(
+            domain=search_domain,
+            fields=show_fields,
+            delimeter=delimeter,
+            chunk_size=1,
+        )
+        self.assertEqual(correct_result, list(record_iter))
 
     def test_create_or_update_by_external_id(self):
         partner_obj = self.env["res.partner"]
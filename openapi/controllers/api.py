@@ -111,10 +111,12 @@ class ApiV1Controller(http.Controller):
         pinguin.method_is_allowed(
             "api_read", conf["method"], main=True, raise_exception=True
         )
+        params = pinguin.get_read_multi_params(conf, kw)
         return pinguin.wrap__resource__read_all(
             modelname=model,
             success_code=pinguin.CODE__success,
             out_fields=conf["out_fields_read_multi"],
+            **params
         )
 
     # ReadOne (optional: include_fields, exclude_fields)
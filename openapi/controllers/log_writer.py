@@ -0,0 +1,140 @@
+# License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+"""Background writer of openapi.log records.
+
+Log values are put to a bounded in-process queue. A daemon thread takes them
+from the queue and creates the records in batches (i.e. with multi-row
+inserts) in a separate cursor per database and user.
+
+Settings in the odoo config file:
+
+* ``openapi_log_mode``: ``async`` (default) or ``sync`` -- create the log
+  record in a new cursor right after processing the request
+* ``openapi_log_queue_size``: max number of not yet saved records. Default: 1000
+* ``openapi_log_queue_full``: what to do when the queue is full: ``drop``
+  (default) the log record or ``block`` the request until there is space
+* ``openapi_log_batch_size``: max number of records per insert. Default: 100
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+
+import odoo
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+LOG_MODE_ASYNC = "async"
+LOG_MODE_SYNC = "sync"
+QUEUE_FULL_DROP = "drop"
+QUEUE_FULL_BLOCK = "block"
+STOP_TIMEOUT = 5
+
+
+def get_log_mode():
+    return config.get("openapi_log_mode") or LOG_MODE_ASYNC
+
+
+class LogWriter(object):
+    def __init__(self, maxsize=1000, batch_size=100, on_full=QUEUE_FULL_DROP):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.on_full = on_full
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _ensure_started(self):
+        # thread and queue are not inherited by forked workers
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self.maxsize)
+                self.dropped = 0
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="openapi.log.writer", daemon=True
+            )
+            self._thread.start()
+
+    def put(self, dbname, uid, vals):
+        """Adds values of openapi.log record to the queue"""
+        self._ensure_started()
+        item = (dbname, uid, vals)
+        if self.on_full == QUEUE_FULL_BLOCK:
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            _logger.warning(
+                "OpenAPI log queue is full, log record is dropped (%s in total): %s",
+                self.dropped,
+                vals.get("request"),
+            )
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """Saves queued records and stops the thread"""
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            _logger.warning("OpenAPI log queue is full, not saved records are lost")
+            return
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while len(items) < self.batch_size and items[-1] is not None:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = items[-1] is None
+            if stop:
+                items.pop()
+            self._write(items)
+            if stop:
+                return
+
+    def _write(self, items):
+        vals_by_key = defaultdict(list)
+        for dbname, uid, vals in items:
+            vals_by_key[(dbname, uid)].append(vals)
+        for (dbname, uid), vals_list in vals_by_key.items():
+            try:
+                with odoo.registry(dbname).cursor() as cr:
+                    env = odoo.api.Environment(cr, uid, {})
+                    env["openapi.log"].create(vals_list)
+            except Exception:
+                _logger.exception(
+                    "Cannot save %s OpenAPI log records in %s", len(vals_list), dbname
+                )
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_log_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = LogWriter(
+                    maxsize=int(config.get("openapi_log_queue_size") or 1000),
+                    batch_size=int(config.get("openapi_log_batch_size") or 100),
+                    on_full=config.get("openapi_log_queue_full") or QUEUE_FULL_DROP,
+                )
+                atexit.register(_writer.stop)
+    return _writer
@@ -22,29 +22,44 @@ Todo:
    https://google.github.io/styleguide/pyguide.html
 """
 import base64
+import copy
 import functools
 import traceback
+import urllib.parse as urlparse
 
 import werkzeug.wrappers
 
 import odoo
 from odoo.http import request
+from odoo.osv import expression
 from odoo.service import security
+from odoo.tools import date_utils, split_every
 
 from odoo.addons.base_api.lib.pinguin import (
     error_response,
     get_dict_from_record,
     get_dictlist_from_model,
     get_model_for_read,
+    iter_dictlist_from_model,
 )
 from odoo.addons.web.controllers.main import ReportController
 
+from . import log_writer
+
 try:
     import simplejson as json
 except ImportError:
     import json
 
 
+# Streaming of records on reading many records
+STREAM_CHUNK_SIZE = 500
+STREAM_CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+
 ####################################
 # Definition of global error codes #
 ####################################
@@ -56,6 +71,7 @@ CODE__accepted = 202
 CODE__ok_no_content = 204
 # 4xx Client Errors
 CODE__server_rejects = (400, "Server rejected", "Welcome to macondo!")
+CODE__invalid_params = (400, "Invalid parameters", "%s")
 CODE__no_user_auth = (401, "Authentication", "Your token could not be authenticated.")
 CODE__user_no_perm = (403, "Permissions", "%s")
 CODE__method_blocked = (
@@ -95,11 +111,12 @@ CODE__no_api_worker = (
 )
 
 
-def successful_response(status, data=None):
+def successful_response(status, data=None, headers=None):
     """Successful responses wrapper.
 
     :param int status: The success code.
     :param data: (optional). The data that can be converted to a JSON.
+    :param dict headers: (optional). Extra headers of the response.
 
     :returns: The werkzeug `response object`_.
     :rtype: werkzeug.wrappers.Response
@@ -113,7 +130,50 @@ def successful_response(status, data=None):
     except AttributeError:
         pass
 
-    return request.make_json_response(data, status=status)
+    return request.make_json_response(data, headers=headers, status=status)
+
+
+def streaming_response(status, records, fmt="json", headers=None):
+    """Streaming successful responses wrapper.
+
+    The body is sent as soon as first records are converted, so a big list
+    of records is never kept in memory as a whole.
+
+    :param int status: The success code.
+    :param records: Iterable of dictionaries that can be converted to a JSON.
+    :param str fmt: (optional). ``json`` to send a JSON array or ``ndjson``
+        to send one JSON object per line.
+    :param dict headers: (optional). Extra headers of the response.
+
+    :returns: The werkzeug `response object`_.
+    :rtype: werkzeug.wrappers.Response
+    """
+
+    def generate():
+        if fmt == "json":
+            yield b"["
+        first = True
+        for chunk in split_every(STREAM_CHUNK_SIZE, records):
+            lines = [
+                json.dumps(r, ensure_ascii=False, default=date_utils.json_default)
+                for r in chunk
+            ]
+            if fmt == "ndjson":
+                data = "".join(line + "\n" for line in lines)
+            else:
+                data = ("" if first else ",") + ",".join(lines)
+            first = False
+            yield data.encode()
+        if fmt == "json":
+            yield b"]"
+
+    return werkzeug.wrappers.Response(
+        generate(),
+        status=status,
+        headers=headers,
+        content_type=STREAM_CONTENT_TYPES[fmt],
+        direct_passthrough=True,
+    )
 
 
 ##########################
@@ -132,11 +192,14 @@ def authenticate_token_for_user(token):
 
     :raise: werkzeug.exceptions.HTTPException if user not found.
     """
-    user = request.env["res.users"].sudo().search([("openapi_token", "=", token)])
-    if user.exists():
+    # cached per worker, see res.users._get_openapi_user
+    user_data = request.env["res.users"].sudo()._get_openapi_user(token)
+    if user_data:
+        uid, login = user_data
+        user = request.env["res.users"].browse(uid)
         # copy-pasted from odoo.http.py:OpenERPSession.authenticate()
         request.session.uid = user.id
-        request.session.login = user.login
+        request.session.login = login
         request.session.session_token = user.id and security.compute_session_token(
             request.session, request.env
         )
@@ -251,6 +314,13 @@ def get_namespace_by_name_from_users_namespaces(
     :raise: werkzeug.exceptions.HTTPException if the namespace is not contained
                                               in allowed user namespaces.
     """
+    # cached per worker, see res.users._get_openapi_namespaces
+    allowed_namespaces = request.env["res.users"]._get_openapi_namespaces(user.id)
+    if namespace_name in allowed_namespaces:
+        return request.env["openapi.namespace"].browse(
+            allowed_namespaces[namespace_name]
+        )
+
     namespace = request.env["openapi.namespace"].search([("name", "=", namespace_name)])
 
     if not namespace.exists() and raise_exception:
@@ -272,15 +342,32 @@ def create_log_record(**kwargs):
     # don't create log in test mode as it's impossible in case of error in sql
     # request (we cannot use second cursor and we cannot use aborted
     # transaction)
-    if not test_mode:
+    if test_mode:
+        return
+    if log_writer.get_log_mode() == log_writer.LOG_MODE_SYNC:
         with odoo.registry(request.session.db).cursor() as cr:
             # use new to save data even in case of an error in the old cursor
             env = odoo.api.Environment(cr, request.session.uid, {})
             _create_log_record(env, **kwargs)
+        return
+    # the record is created later in a background thread
+    log_writer.get_log_writer().put(
+        request.session.db, request.session.uid, _prepare_log_vals(**kwargs)
+    )
 
 
-def _create_log_record(
-    env,
+def _create_log_record(env, **kwargs):
+    """create log for request
+
+    See _prepare_log_vals for the arguments.
+
+    :returns: New 'openapi.log' record.
+    :rtype: ..models.openapi_log.Log
+    """
+    return env["openapi.log"].create(_prepare_log_vals(**kwargs))
+
+
+def _prepare_log_vals(
     namespace_id=None,
     namespace_log_request=None,
     namespace_log_response=None,
@@ -288,7 +375,7 @@ def _create_log_record(
     user_request=None,
     user_response=None,
 ):
-    """create log for request
+    """Prepare values of the log for request
 
     :param int namespace_id: Requested namespace id.
     :param string namespace_log_request: Request save option.
@@ -299,33 +386,32 @@ def _create_log_record(
     :param user_response: a wrapped werkzeug Response object to user.
     :type user_response: :class:`werkzeug.wrappers.Response`
 
-    :returns: New 'openapi.log' record.
-    :rtype: ..models.openapi_log.Log
+    :returns: Values for a new 'openapi.log' record. Data of request and
+              response are rendered here, because the objects may be no
+              longer usable, when the record is created.
+    :rtype: dict
     """
-    if True:  # just to keep original indent
-        log_data = {
-            "namespace_id": namespace_id,
-            "request": "%s | %s | %d"
-            % (user_request.url, user_request.method, user_response.status_code),
-            "request_data": None,
-            "response_data": None,
-        }
-        if namespace_log_request == "debug":
-            log_data["request_data"] = user_request.__dict__
-        elif namespace_log_request == "info":
-            log_data["request_data"] = user_request.__dict__
-            for k in ["form", "files"]:
-                try:
-                    del log_data["request_data"][k]
-                except KeyError:
-                    pass
-
-        if namespace_log_response == "debug":
-            log_data["response_data"] = user_response.__dict__
-        elif namespace_log_response == "error" and user_response.status_code > 400:
-            log_data["response_data"] = user_response.__dict__
-
-        return env["openapi.log"].create(log_data)
+    log_data = {
+        "namespace_id": namespace_id,
+        "request": "%s | %s | %d"
+        % (user_request.url, user_request.method, user_response.status_code),
+        "request_data": None,
+        "response_data": None,
+    }
+    if namespace_log_request == "debug":
+        log_data["request_data"] = str(user_request.__dict__)
+    elif namespace_log_request == "info":
+        request_data = dict(user_request.__dict__)
+        for k in ["form", "files"]:
+            request_data.pop(k, None)
+        log_data["request_data"] = str(request_data)
+
+    if namespace_log_response == "debug":
+        log_data["response_data"] = str(user_response.__dict__)
+    elif namespace_log_response == "error" and user_response.status_code > 400:
+        log_data["response_data"] = str(user_response.__dict__)
+
+    return log_data
 
 
 # Patched http route
@@ -391,7 +477,6 @@ def route(controller_method):
 ############################
 
 
-# TODO: cache per model and database
 # Get the specific context(openapi.access)
 def get_create_context(namespace, model, canned_context):
     """Get the requested preconfigured context of the model specification.
@@ -411,30 +496,16 @@ def get_create_context(namespace, model, canned_context):
     :raise: werkzeug.exceptions.HTTPException TODO: add description in which case
     """
     cr, uid = request.cr, request.session.uid
-
-    # Singleton by construction (_sql_constraints)
-    openapi_access = request.env(cr, uid)["openapi.access"].search(
-        [("model_id", "=", model), ("namespace_id.name", "=", namespace)]
-    )
-
-    assert (
-        len(openapi_access) == 1
-    ), "'openapi_access' is not a singleton, bad construction."
-    # Singleton by construction (_sql_constraints)
-    context = openapi_access.create_context_ids.filtered(
-        lambda r: r["name"] == canned_context
-    )
-    assert len(context) == 1, "'context' is not a singleton, bad construction."
-
-    if not context:
+    conf = get_model_openapi_access(namespace, model)
+    context_id = conf["create_contexts"].get(canned_context)
+    if not context_id:
         raise werkzeug.exceptions.HTTPException(
             response=error_response(*CODE__canned_ctx_not_found)
         )
 
-    return context
+    return request.env(cr, uid)["openapi.access.create.context"].browse(context_id)
 
 
-# TODO: cache per model and database
 # Get model configuration (openapi.access)
 def get_model_openapi_access(namespace, model):
     """Get the model configuration and validate the requested namespace against the session.
@@ -458,9 +529,11 @@ def get_model_openapi_access(namespace, model):
             The layout of the dict is as follows:
             ```python
             {'context':                 (Dict)      odoo context (default values through context),
+            'create_contexts':          (Dict)      name -> id of canned contexts,
             'out_fields_read_multi':    (Tuple)     field spec,
             'out_fields_read_one':      (Tuple)     field spec,
             'out_fields_create_one':    (Tuple)     field spec,
+            'max_page_size':            (Int)       max number of records on ReadMulti,
             'method' : {
                 'public' : {
                      'mode':            (String)    one of 'all', 'none', 'custom',
@@ -480,73 +553,181 @@ def get_model_openapi_access(namespace, model):
     :raise: werkzeug.exceptions.HTTPException if the namespace has no accesses.
     """
     # TODO: this method has code duplicates with openapi specification code (e.g. get_OAS_definitions_part)
-    cr, uid = request.cr, request.session.uid
-    # Singleton by construction (_sql_constraints)
-    openapi_access = (
-        request.env(cr, uid)["openapi.access"]
-        .sudo()
-        .search([("model_id", "=", model), ("namespace_id.name", "=", namespace)])
-    )
-    if not openapi_access.exists():
+    conf = request.env["openapi.access"].sudo()._get_api_conf(namespace, model)
+    if not conf:
         raise werkzeug.exceptions.HTTPException(
             response=error_response(*CODE__canned_ctx_not_found)
         )
+    # cached value is shared between requests
+    return copy.deepcopy(conf)
+
+
+# Validate query parameters of ReadMulti
+def get_read_multi_params(conf, params):
+    """Get arguments for reading multiple records from the request parameters.
+
+    Only fields from the Read Many Fields of the model configuration can be used
+    in ``domain`` and ``order``. The ``limit`` is bounded by the max page size of
+    the configuration. If there is a limit and neither ``order`` nor ``offset``
+    is specified, records are ordered by id and the next page is requested by
+    the ``cursor`` parameter (keyset pagination).
+
+    :param dict conf: The model API configuration, see get_model_openapi_access.
+    :param dict params: The request parameters:
+        * ``domain``: (optional). JSON list with odoo domain.
+        * ``offset``: (optional). The offset of the queried records.
+        * ``limit``: (optional). The limit to query.
+        * ``order``: (optional). The order, e.g. ``name desc, id``.
+        * ``cursor``: (optional). The id of the last record on the previous page.
+        * ``stream``: (optional). ``json`` or ``ndjson`` to stream the records.
+
+    :returns: Keyword arguments for wrap__resource__read_all.
+    :rtype: dict
+    :raise: werkzeug.exceptions.HTTPException if parameters are not valid.
+    """
+    allowed_paths = get_allowed_field_paths(conf["out_fields_read_multi"])
+
+    domain = []
+    if params.get("domain"):
+        try:
+            domain = json.loads(params["domain"])
+        except ValueError:
+            raise_invalid_params("The domain must be a JSON list.")
+        domain = validate_domain(domain, allowed_paths)
+
+    order = params.get("order") or None
+    if order:
+        validate_order(order, allowed_paths)
+
+    offset = _get_int_param(params, "offset", 0) or 0
+    limit = _get_int_param(params, "limit", 1)
+    cursor = _get_int_param(params, "cursor", 0)
+    max_page_size = conf["max_page_size"]
+    if max_page_size:
+        limit = min(limit or max_page_size, max_page_size)
+
+    stream = params.get("stream") or None
+    if stream and stream not in STREAM_CONTENT_TYPES:
+        raise_invalid_params(
+            "The stream must be one of: %s." % ", ".join(STREAM_CONTENT_TYPES)
+        )
 
-    res = {
-        "context": {},  # Take ot here FIXME: make sure it is for create_context
-        "out_fields_read_multi": (),
-        "out_fields_read_one": (),
-        "out_fields_create_one": (),  # FIXME: for what?
-        "method": {
-            "public": {"mode": "", "whitelist": []},
-            "private": {"mode": "", "whitelist": []},
-            "main": {"mode": "", "whitelist": []},
-        },
+    keyset = bool(limit) and not order and not offset
+    if cursor is not None:
+        if order or offset:
+            raise_invalid_params("The cursor cannot be used with offset or order.")
+        domain = expression.AND([domain, [("id", ">", cursor)]])
+    if keyset or cursor is not None:
+        order = "id"
+
+    return {
+        "domain": domain,
+        "offset": offset,
+        "limit": limit,
+        "order": order,
+        "keyset": keyset,
+        "stream": stream,
     }
-    # Infer public method mode
-    if openapi_access.api_public_methods and openapi_access.public_methods:
-        res["method"]["public"]["mode"] = "custom"
-        res["method"]["public"]["whitelist"] = openapi_access.public_methods.split()
-    elif openapi_access.api_public_methods:
-        res["method"]["public"]["mode"] = "all"
-    else:
-        res["method"]["public"]["mode"] = "none"
 
-    # Infer private method mode
-    if openapi_access.private_methods:
-        res["method"]["private"]["mode"] = "custom"
-        res["method"]["private"]["whitelist"] = openapi_access.private_methods.split()
-    else:
-        res["method"]["private"]["mode"] = "none"
-
-    for c in openapi_access.create_context_ids.mapped("context"):
-        res["context"].update(json.loads(c))
-
-    res["out_fields_read_multi"] = openapi_access.read_many_id.export_fields.mapped(
-        "name"
-    ) or ("id",)
-    res["out_fields_read_one"] = openapi_access.read_one_id.export_fields.mapped(
-        "name"
-    ) or ("id",)
-
-    if openapi_access.public_methods:
-        res["method"]["public"]["whitelist"] = openapi_access.public_methods.split()
-    if openapi_access.private_methods:
-        res["method"]["private"]["whitelist"] = openapi_access.private_methods.split()
-
-    main_methods = ["api_create", "api_read", "api_update", "api_delete"]
-    for method in main_methods:
-        if openapi_access[method]:
-            res["method"]["main"]["whitelist"].append(method)
-
-    if len(res["method"]["main"]["whitelist"]) == len(main_methods):
-        res["method"]["main"]["mode"] = "all"
-    elif not res["method"]["main"]["whitelist"]:
-        res["method"]["main"]["mode"] = "none"
-    else:
-        res["method"]["main"]["mode"] = "custom"
 
-    return res
+def get_allowed_field_paths(out_fields):
+    """Get field paths (in domain notation) that can be used for filtering.
+
+    :param tuple out_fields: Canned fields, e.g. ``('id', 'company_id/name')``.
+
+    :returns: Set of paths, e.g. ``{'id', 'company_id', 'company_id.name'}``.
+    :rtype: set
+    """
+    paths = {"id"}
+    for name in out_fields:
+        parts = name.split("/")
+        for i in range(len(parts)):
+            paths.add(".".join(parts[: i + 1]))
+    return paths
+
+
+def validate_domain(domain, allowed_paths):
+    """Check that the domain is well-formed and uses allowed fields only.
+
+    :returns: The domain with leafs converted to tuples.
+    :rtype: list
+    :raise: werkzeug.exceptions.HTTPException if the domain is not valid.
+    """
+    if not isinstance(domain, list):
+        raise_invalid_params("The domain must be a JSON list.")
+    result = []
+    for term in domain:
+        if term in expression.DOMAIN_OPERATORS:
+            result.append(term)
+            continue
+        if not (
+            isinstance(term, list)
+            and len(term) == 3
+            and isinstance(term[0], str)
+            and term[1] in expression.TERM_OPERATORS
+        ):
+            raise_invalid_params("Invalid domain term: %s" % json.dumps(term))
+        if term[0] not in allowed_paths:
+            raise_invalid_params("The field %r cannot be used in domain." % term[0])
+        result.append(tuple(term))
+    try:
+        expression.normalize_domain(result)
+    except AssertionError:
+        raise_invalid_params("The domain is syntactically not correct.")
+    return result
+
+
+def validate_order(order, allowed_paths):
+    """Check that the order uses allowed fields only.
+
+    :raise: werkzeug.exceptions.HTTPException if the order is not valid.
+    """
+    for part in order.split(","):
+        words = part.split()
+        if (
+            not 1 <= len(words) <= 2
+            or words[0] not in allowed_paths
+            or "." in words[0]
+            or len(words) == 2
+            and words[1].lower() not in ("asc", "desc")
+        ):
+            raise_invalid_params("Invalid order: %r" % part.strip())
+
+
+def _get_int_param(params, name, minimum):
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        value = int(value)
+    except ValueError:
+        value = None
+    if value is None or value < minimum:
+        raise_invalid_params(
+            "The %s must be an integer not less than %s." % (name, minimum)
+        )
+    return value
+
+
+def raise_invalid_params(message):
+    err = list(CODE__invalid_params)
+    err[2] = message
+    raise werkzeug.exceptions.HTTPException(response=error_response(*err))
+
+
+def get_next_page_url(params):
+    """Get url of the current request with updated parameters.
+
+    :param dict params: The parameters to update.
+
+    :returns: The url.
+    :rtype: str
+    """
+    args = request.httprequest.args.to_dict()
+    args.update(params)
+    if "cursor" in params:
+        args.pop("offset", None)
+    return "%s?%s" % (request.httprequest.base_url, urlparse.urlencode(args))
 
 
 ##################
@@ -584,18 +765,87 @@ def wrap__resource__create_one(modelname, context, data, success_code, out_field
     return successful_response(success_code, out_data)
 
 
-def wrap__resource__read_all(modelname, success_code, out_fields):
+def wrap__resource__read_all(
+    modelname,
+    success_code,
+    out_fields,
+    domain=None,
+    offset=0,
+    limit=None,
+    order=None,
+    keyset=False,
+    stream=None,
+):
     """function to read all records.
 
     :param str modelname: The name of the model.
     :param int success_code: The success code.
     :param tuple out_fields: Canned fields.
-
-    :returns: successful response with records data
+    :param list domain: (optional). The domain to filter on.
+    :param int offset: (optional). The offset of the queried records.
+    :param int limit: (optional). The limit to query.
+    :param str order: (optional). The postgres order string.
+    :param bool keyset: (optional). Whether the next page is requested by
+        the id of the last record instead of the offset.
+    :param str stream: (optional). ``json`` or ``ndjson`` to send records
+        by chunks while they are read, see streaming_response.
+
+    :returns: successful response with records data. If there may be more
+              records, the response has a ``Link`` header to the next page.
     :rtype: werkzeug.wrappers.Response
     """
-    data = get_dictlist_from_model(modelname, out_fields)
-    return successful_response(success_code, data)
+    domain = domain or []
+    if not limit:
+        if stream:
+            records = _iter_dictlist_in_new_cursor(
+                modelname, out_fields, domain=domain, offset=offset, order=order
+            )
+            return streaming_response(success_code, records, stream)
+        data = get_dictlist_from_model(
+            modelname, out_fields, domain=domain, offset=offset, order=order
+        )
+        return successful_response(success_code, data)
+
+    records = (
+        get_model_for_read(modelname)
+        .sudo()
+        .search(domain, offset=offset, limit=limit, order=order)
+    )
+    headers = None
+    if len(records) == limit:
+        if keyset:
+            next_params = {"cursor": records[-1].id}
+        else:
+            next_params = {"offset": offset + limit}
+        headers = {"Link": '<%s>; rel="next"' % get_next_page_url(next_params)}
+    domain = [("id", "in", records.ids)]
+    if stream:
+        records = _iter_dictlist_in_new_cursor(
+            modelname, out_fields, domain=domain, order=order
+        )
+        return streaming_response(success_code, records, stream, headers=headers)
+    data = get_dictlist_from_model(modelname, out_fields, domain=domain, order=order)
+    return successful_response(success_code, data, headers=headers)
+
+
+def _iter_dictlist_in_new_cursor(modelname, out_fields, **kwargs):
+    """Generator of records data that doesn't depend on the current request.
+
+    The response is streamed after the request is finished and its cursor is
+    closed, so the database, user and context are taken from the request
+    right away and the records are read in a new cursor.
+    """
+    dbname, uid = request.session.db, request.session.uid
+    context = dict(request.env.context)
+
+    def generate():
+        with odoo.registry(dbname).cursor() as cr:
+            env = odoo.api.Environment(cr, uid, context)
+            yield from iter_dictlist_from_model(
+                modelname, out_fields, chunk_size=STREAM_CHUNK_SIZE, env=env, **kwargs
+            )
+
+    return generate()
 
 
 def wrap__resource__read_one(modelname, id, success_code, out_fields):
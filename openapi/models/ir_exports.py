@@ -6,6 +6,33 @@ from odoo import _, api, exceptions, models
 class IrExports(models.Model):
     _inherit = "ir.exports"
 
+    def write(self, vals):
+        res = super(IrExports, self).write(vals)
+        self._clear_openapi_caches()
+        return res
+
+    def unlink(self):
+        used = self._is_used_by_openapi()
+        res = super(IrExports, self).unlink()
+        if used:
+            self.clear_caches()
+        return res
+
+    def _is_used_by_openapi(self):
+        return bool(self) and bool(
+            self.env["openapi.access"]
+            .sudo()
+            .with_context(active_test=False)
+            .search_count(
+                ["|", ("read_one_id", "in", self.ids), ("read_many_id", "in", self.ids)]
+            )
+        )
+
+    def _clear_openapi_caches(self):
+        # see openapi.access._get_api_conf
+        if self._is_used_by_openapi():
+            self.clear_caches()
+
     @api.constrains("resource", "export_fields")
     def _check_fields(self):
         # this exports record used in openapi.access
@@ -31,3 +58,26 @@ class IrExports(models.Model):
                     _('You must delete the "%s" field or "%s" field')
                     % (fields[i], fields[i + 1])
                 )
+
+
+class IrExportsLine(models.Model):
+    _inherit = "ir.exports.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(IrExportsLine, self).create(vals_list)
+        res.export_id._clear_openapi_caches()
+        return res
+
+    def write(self, vals):
+        exports = self.export_id
+        res = super(IrExportsLine, self).write(vals)
+        (exports | self.export_id)._clear_openapi_caches()
+        return res
+
+    def unlink(self):
+        used = self.export_id._is_used_by_openapi()
+        res = super(IrExportsLine, self).unlink()
+        if used:
+            self.clear_caches()
+        return res
@@ -9,7 +9,7 @@ import types
 import urllib.parse as urlparse
 from inspect import getmro, isclass
 
-from odoo import _, api, exceptions, fields, models
+from odoo import _, api, exceptions, fields, models, tools
 
 from odoo.addons.base_api.lib.pinguin import transform_strfields_to_dict
 
@@ -24,6 +24,53 @@ PARAM_ID = {
     "format": "int64",
 }
 
+PARAMS_READ_MANY = [
+    {
+        "name": "domain",
+        "in": "query",
+        "description": "Filter in odoo domain notation as a JSON list, "
+        'e.g. [["name", "ilike", "john"]]. '
+        "Only fields from Read Many Fields are allowed",
+        "type": "string",
+    },
+    {
+        "name": "limit",
+        "in": "query",
+        "description": "Max number of records. "
+        "It cannot exceed Max Page Size of the model",
+        "type": "integer",
+        "minimum": 1,
+    },
+    {
+        "name": "offset",
+        "in": "query",
+        "description": "Number of records to skip",
+        "type": "integer",
+        "minimum": 0,
+    },
+    {
+        "name": "order",
+        "in": "query",
+        "description": "Order of records, e.g. name desc, id",
+        "type": "string",
+    },
+    {
+        "name": "stream",
+        "in": "query",
+        "description": "Send records while they are read: "
+        "json -- as a usual JSON array, ndjson -- one JSON object per line",
+        "type": "string",
+        "enum": ["json", "ndjson"],
+    },
+    {
+        "name": "cursor",
+        "in": "query",
+        "description": "Id of the last record of the previous page. "
+        "Use the Link header of the response to get the next page",
+        "type": "integer",
+    },
+]
+
 
 class Access(models.Model):
     _name = "openapi.access"
@@ -74,6 +121,11 @@ class Access(models.Model):
         help="Fields to return on reading via non one-record endpoint",
         domain="[('resource', '=', model)]",
     )
+    max_page_size = fields.Integer(
+        "Max Page Size",
+        help="Max number of records returned by reading via non one-record endpoint. "
+        "Bigger results are split into pages. 0 means no limit",
+    )
     create_context_ids = fields.Many2many(
         "openapi.access.create.context",
         string="Creation Context Presets",
@@ -89,6 +141,95 @@ class Access(models.Model):
         )
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        res = super(Access, self).create(vals_list)
+        # see _get_api_conf
+        self.clear_caches()
+        return res
+
+    def write(self, vals):
+        res = super(Access, self).write(vals)
+        self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(Access, self).unlink()
+        self.clear_caches()
+        return res
+
+    @api.model
+    @tools.ormcache("namespace", "model")
+    def _get_api_conf(self, namespace, model):
+        """Returns API configuration of the model in the namespace or None.
+
+        See pinguin.get_model_openapi_access for the layout of the result.
+        The result is shared between requests and must not be modified.
+        """
+        # Singleton by construction (_sql_constraints)
+        access = self.sudo().search(
+            [("model_id.model", "=", model), ("namespace_id.name", "=", namespace)]
+        )
+        if not access:
+            return None
+
+        res = {
+            "context": {},  # Take ot here FIXME: make sure it is for create_context
+            "create_contexts": {},
+            "out_fields_read_multi": (),
+            "out_fields_read_one": (),
+            "out_fields_create_one": (),  # FIXME: for what?
+            "max_page_size": access.max_page_size,
+            "method": {
+                "public": {"mode": "", "whitelist": []},
+                "private": {"mode": "", "whitelist": []},
+                "main": {"mode": "", "whitelist": []},
+            },
+        }
+        # Infer public method mode
+        if access.api_public_methods and access.public_methods:
+            res["method"]["public"]["mode"] = "custom"
+        elif access.api_public_methods:
+            res["method"]["public"]["mode"] = "all"
+        else:
+            res["method"]["public"]["mode"] = "none"
+
+        # Infer private method mode
+        if access.private_methods:
+            res["method"]["private"]["mode"] = "custom"
+        else:
+            res["method"]["private"]["mode"] = "none"
+
+        for c in access.create_context_ids:
+            res["context"].update(json.loads(c.context))
+            res["create_contexts"][c.name] = c.id
+
+        res["out_fields_read_multi"] = access.read_many_id.export_fields.mapped(
+            "name"
+        ) or ("id",)
+        res["out_fields_read_one"] = access.read_one_id.export_fields.mapped(
+            "name"
+        ) or ("id",)
+
+        if access.public_methods:
+            res["method"]["public"]["whitelist"] = access.public_methods.split()
+        if access.private_methods:
+            res["method"]["private"]["whitelist"] = access.private_methods.split()
+
+        main_methods = ["api_create", "api_read", "api_update", "api_delete"]
+        for method in main_methods:
+            if access[method]:
+                res["method"]["main"]["whitelist"].append(method)
+
+        if len(res["method"]["main"]["whitelist"]) == len(main_methods):
+            res["method"]["main"]["mode"] = "all"
+        elif not res["method"]["main"]["whitelist"]:
+            res["method"]["main"]["mode"] = "none"
+        else:
+            res["method"]["main"]["mode"] = "custom"
+
+        return res
+
     @api.model
     def _get_method_list(self):
         return {
@@ -223,7 +364,8 @@ class Access(models.Model):
                 "summary": "Get all %s objects" % model_name,
                 "description": "Returns all %s objects" % model_name,
                 "operationId": "getAll%s" % capitalized_model_name,
-                "produces": ["application/json"],
+                "produces": ["application/json", "application/x-ndjson"],
+                "parameters": PARAMS_READ_MANY,
                 "responses": {
                     "200": {
                         "description": "A list of %s." % model_name,
@@ -231,7 +373,15 @@ class Access(models.Model):
                             "type": "array",
                             "items": {"$ref": read_many_definition_ref},
                         },
-                    }
+                        "headers": {
+                            "Link": {
+                                "type": "string",
+                                "description": "Link to the next page, "
+                                "if there may be more records",
+                            }
+                        },
+                    },
+                    "400": {"description": "Invalid parameters"},
                 },
             }
 
@@ -467,7 +617,15 @@ class AccessCreateContext(models.Model):
 
     def write(self, vals):
         vals = self._fix_name(vals)
-        return super(AccessCreateContext, self).write(vals)
+        res = super(AccessCreateContext, self).write(vals)
+        # see openapi.access._get_api_conf
+        self.clear_caches()
+        return res
+
+    def unlink(self):
+        res = super(AccessCreateContext, self).unlink()
+        self.clear_caches()
+        return res
 
     @api.constrains("context")
     def _check_context(self):
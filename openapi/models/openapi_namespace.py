@@ -12,6 +12,8 @@ from odoo import api, fields, models
 
 from odoo.addons.base_api.lib import pinguin
 
+from .res_users import auth_cache
+
 
 class Namespace(models.Model):
 
@@ -93,11 +95,22 @@ class Namespace(models.Model):
     def create(self, vals_list):
         for vals in vals_list:
             vals = self._fix_name(vals)
-        return super(Namespace, self).create(vals_list)
+        res = super(Namespace, self).create(vals_list)
+        # see res.users._get_openapi_namespaces
+        auth_cache.clear(self.env.cr.dbname)
+        return res
 
     def write(self, vals):
         vals = self._fix_name(vals)
-        return super(Namespace, self).write(vals)
+        res = super(Namespace, self).write(vals)
+        if {"name", "active", "user_ids"} & set(vals):
+            auth_cache.clear(self.env.cr.dbname)
+        return res
+
+    def unlink(self):
+        res = super(Namespace, self).unlink()
+        auth_cache.clear(self.env.cr.dbname)
+        return res
 
     def get_OAS(self):
         current_host = self.env["ir.config_parameter"].sudo().get_param("web.base.url")
@@ -1,9 +1,58 @@
 # Copyright 2018-2019 Ivan Yelizariev <https://it-projects.info/team/yelizariev>
 # Copyright 2018 Rafis Bikbov <https://it-projects.info/team/bikbov>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import threading
+import time
 import uuid
+from collections import OrderedDict
 
 from odoo import api, fields, models
+from odoo.tools import config
+
+
+class AuthCache(object):
+    """Bounded per-worker cache of authentication data with expiration.
+
+    Only data of existing users is cached, so requests with unknown tokens
+    cannot fill the cache. Clearing affects the current worker only, other
+    workers get the changes when their entries expire.
+    """
+
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            expires_at, value = self._data.get(key, (0, None))
+            if expires_at < time.monotonic():
+                self._data.pop(key, None)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.ttl:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self, dbname):
+        """Drop entries of the database. Keys start with the database name"""
+        with self._lock:
+            for key in [k for k in self._data if k[0] == dbname]:
+                del self._data[key]
+
+
+auth_cache = AuthCache(
+    maxsize=int(config.get("openapi_auth_cache_size") or 10000),
+    ttl=float(config.get("openapi_auth_cache_ttl") or 60),
+)
 
 
 class ResUsers(models.Model):
@@ -15,9 +64,46 @@ class ResUsers(models.Model):
         default=lambda self: self._get_unique_openapi_token(),
         required=True,
         copy=False,
+        index=True,
         help="Authentication token for access to API (/api).",
     )
 
+    def write(self, vals):
+        res = super(ResUsers, self).write(vals)
+        if {"openapi_token", "active", "login", "namespace_ids"} & set(vals):
+            auth_cache.clear(self.env.cr.dbname)
+        return res
+
+    def unlink(self):
+        res = super(ResUsers, self).unlink()
+        auth_cache.clear(self.env.cr.dbname)
+        return res
+
+    @api.model
+    def _get_openapi_user(self, token):
+        """Returns (uid, login) of the active user with the token or None"""
+        key = (self.env.cr.dbname, "user", token)
+        user_data = auth_cache.get(key)
+        if user_data:
+            return user_data
+        user = self.sudo().search([("openapi_token", "=", token)], limit=1)
+        if not user:
+            # unknown tokens are not cached
+            return None
+        user_data = (user.id, user.login)
+        auth_cache.set(key, user_data)
+        return user_data
+
+    @api.model
+    def _get_openapi_namespaces(self, uid):
+        """Returns dictionary: name -> id of active namespaces allowed for the user"""
+        key = (self.env.cr.dbname, "namespaces", uid)
+        namespaces = auth_cache.get(key)
+        if namespaces is None:
+            namespaces = {n.name: n.id for n in self.sudo().browse(uid).namespace_ids}
+            auth_cache.set(key, namespaces)
+        return namespaces
+
     def reset_openapi_token(self):
         for record in self:
             record.write({"openapi_token": self._get_unique_openapi_token()})
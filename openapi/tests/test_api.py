@@ -3,7 +3,9 @@
 # Copyright 2019 Anvar Kildebekov <https://it-projects.info/team/fedoranvar>
 # Copyright 2021 Denis Mudarisov <https://github.com/trojikman>
 # License LGPL-3.0 or later (http://www.gnu.org/licenses/lgpl.html).
+import json
 import logging
+from unittest.mock import patch
 
 import requests
 
@@ -13,6 +15,7 @@ from odoo.tests.common import HttpCase, get_db_name
 from odoo.tools import config
 
 from ..controllers import pinguin
+from ..models.res_users import auth_cache
 
 _logger = logging.getLogger(__name__)
 
@@ -56,6 +59,98 @@ class TestAPI(HttpCase):
         self.assertEqual(resp.status_code, pinguin.CODE__success)
         # TODO check content
 
+    def test_read_many_pages(self):
+        access = self.phantom_env.ref("openapi.access_res_partner_demo")
+        access.max_page_size = 2
+        access.flush_recordset()
+        auth = requests.auth.HTTPBasicAuth(self.db_name, self.demo_user.openapi_token)
+
+        resp = self.request("GET", "/{model}?limit=5", auth=auth)
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        first_page = [r["id"] for r in resp.json()]
+        self.assertEqual(len(first_page), 2)
+        self.assertEqual(first_page, sorted(first_page))
+        self.assertIn("cursor=%s" % first_page[-1], resp.links["next"]["url"])
+
+        resp = self.opener.get(resp.links["next"]["url"], timeout=30, auth=auth)
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        second_page = [r["id"] for r in resp.json()]
+        self.assertTrue(second_page)
+        self.assertGreater(second_page[0], first_page[-1])
+
+        resp = self.request("GET", "/{model}?order=name desc&offset=1", auth=auth)
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        self.assertIn("offset=3", resp.links["next"]["url"])
+
+    def test_read_many_domain(self):
+        partner = self.phantom_env[self.model_name].search([], limit=1)
+        domain = '[["id", "=", %s], "|", ["name", "!=", false], ["email", "!=", false]]'
+        resp = self.request_from_user(
+            self.demo_user, "GET", "/{model}?domain=%s" % (domain % partner.id)
+        )
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        self.assertEqual([r["id"] for r in resp.json()], partner.ids)
+
+        # street is not in Read Many Fields
+        for params in [
+            'domain=[["street", "=", "x"]]',
+            "domain=not a json",
+            "order=street",
+            "limit=0",
+            "cursor=1&offset=1",
+        ]:
+            resp = self.request_from_user(self.demo_user, "GET", "/{model}?" + params)
+            self.assertEqual(resp.status_code, pinguin.CODE__invalid_params[0], params)
+
+    def test_read_many_stream(self):
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}?order=id")
+        records = resp.json()
+        self.assertTrue(records)
+
+        resp = self.request_from_user(
+            self.demo_user, "GET", "/{model}?order=id&stream=json"
+        )
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        self.assertEqual(resp.json(), records)
+
+        resp = self.request_from_user(
+            self.demo_user, "GET", "/{model}?order=id&stream=ndjson"
+        )
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        self.assertEqual(
+            resp.headers["Content-Type"].split(";")[0], "application/x-ndjson"
+        )
+        self.assertEqual([json.loads(line) for line in resp.iter_lines()], records)
+
+        resp = self.request_from_user(
+            self.demo_user, "GET", "/{model}?limit=2&stream=json"
+        )
+        self.assertEqual(len(resp.json()), 2)
+        self.assertIn("next", resp.links)
+
+        resp = self.request_from_user(
+            self.demo_user, "GET", '/{model}?domain=[["id", "<", 0]]&stream=json'
+        )
+        self.assertEqual(resp.json(), [])
+
+    def test_read_many_stream_chunks(self):
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}?order=id")
+        records = resp.json()
+        self.assertGreater(len(records), 2)
+
+        # records are read and sent by several chunks after the request is over
+        with patch.object(pinguin, "STREAM_CHUNK_SIZE", 2):
+            resp = self.request_from_user(
+                self.demo_user, "GET", "/{model}?order=id&stream=json"
+            )
+            self.assertEqual(json.loads(resp.content), records)
+
+            resp = self.request_from_user(
+                self.demo_user, "GET", "/{model}?order=id&stream=ndjson"
+            )
+            lines = resp.content.decode().splitlines()
+            self.assertEqual([json.loads(line) for line in lines], records)
+
     def test_read_one(self):
         record_id = self.phantom_env[self.model_name].search([], limit=1).id
         resp = self.request_from_user(
@@ -155,6 +250,69 @@ class TestAPI(HttpCase):
         self.assertEqual(resp.status_code, pinguin.CODE__user_no_perm[0], resp.json())
         self.assertEqual(resp.json()["error"], pinguin.CODE__user_no_perm[1])
 
+    def test_reset_token(self):
+        old_token = self.demo_user.openapi_token
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}")
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+
+        self.demo_user.reset_openapi_token()
+        self.demo_user.flush_recordset()
+        resp = self.request(
+            "GET",
+            "/{model}",
+            auth=requests.auth.HTTPBasicAuth(self.db_name, old_token),
+        )
+        self.assertEqual(resp.status_code, pinguin.CODE__no_user_auth[0])
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}")
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+
+    def test_access_conf_cache(self):
+        Access = self.phantom_env["openapi.access"]
+        access = self.phantom_env.ref("openapi.access_res_partner_demo")
+        conf = Access._get_api_conf("demo", self.model_name)
+        self.assertIn("email", conf["out_fields_read_multi"])
+        self.assertEqual(
+            conf["create_contexts"],
+            {c.name: c.id for c in access.create_context_ids},
+        )
+        with self.assertQueryCount(0, flush=False):
+            Access._get_api_conf("demo", self.model_name)
+
+        access.read_many_id.export_fields.filtered(
+            lambda line: line.name == "email"
+        ).unlink()
+        conf = Access._get_api_conf("demo", self.model_name)
+        self.assertNotIn("email", conf["out_fields_read_multi"])
+
+        access.api_read = False
+        access.flush_recordset()
+        conf = Access._get_api_conf("demo", self.model_name)
+        self.assertNotIn("api_read", conf["method"]["main"]["whitelist"])
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}")
+        self.assertEqual(resp.status_code, pinguin.CODE__method_blocked[0])
+
+    def test_auth_cache(self):
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}")
+        self.assertEqual(resp.status_code, pinguin.CODE__success)
+        cached = len(auth_cache._data)
+        self.assertTrue(cached)
+
+        # unknown tokens are not cached
+        resp = self.request(
+            "GET",
+            "/{model}",
+            auth=requests.auth.HTTPBasicAuth(self.db_name, "unknown-token"),
+        )
+        self.assertEqual(resp.status_code, pinguin.CODE__no_user_auth[0])
+        self.assertEqual(cached, len(auth_cache._data))
+
+        # allowed namespaces are updated
+        namespace = self.phantom_env.ref("openapi.namespace_demo")
+        self.demo_user.namespace_ids -= namespace
+        self.demo_user.flush_recordset()
+        resp = self.request_from_user(self.demo_user, "GET", "/{model}")
+        self.assertEqual(resp.status_code, pinguin.CODE__user_no_perm[0])
+
     def test_call_allowed_method_on_singleton_record(self):
         if (
             not self.env["ir.module.module"].search([("name", "=", "mail")]).state
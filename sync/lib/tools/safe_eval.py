@@ -18,7 +18,10 @@ import dis
 import functools
 import logging
 import sys
+import threading
 import types
+from collections import OrderedDict
+from hashlib import sha256
 from opcode import HAVE_ARGUMENT, opmap, opname
 from types import CodeType
 
@@ -26,6 +29,7 @@ import werkzeug
 from psycopg2 import OperationalError
 
 from odoo.tools.misc import ustr
+from odoo.tools import safe_eval as odoo_safe_eval
 
 import odoo
 
@@ -420,6 +424,114 @@ def test_python_expr__MAGIC(expr, mode="eval"):
     return False
 
 
+# MAGIC: per-worker cache of validated code objects.
+#
+# Compiling and walking opcodes of a big task code on every job is expensive,
+# so validated code objects are kept in a LRU cache keyed by content hash,
+# evaluation mode, filename and the flavour of safe_eval ("safe" or "magic").
+# Keys depend on the content, so a new version of the code gets a new key and
+# the old one is eventually evicted.
+CODE_CACHE_SIZE = 256
+_CODE_CACHE = OrderedDict()
+_CODE_CACHE_LOCK = threading.RLock()
+
+
+def _test_expr__SAFE(expr, mode="eval", filename=None):
+    # use the checks of odoo itself, including the ones added in updates
+    return odoo_safe_eval.test_expr(
+        expr, odoo_safe_eval._SAFE_OPCODES, mode=mode, filename=filename
+    )
+
+
+def _test_expr__MAGIC(expr, mode="eval", filename=None):
+    return test_expr(expr, _SAFE_OPCODES, mode=mode, filename=filename)
+
+
+_TEST_EXPR = {
+    "safe": _test_expr__SAFE,
+    "magic": _test_expr__MAGIC,
+}
+
+
+def _code_cache_key(expr, mode, opcodes_tag, filename):
+    return (sha256(expr.encode("utf-8")).hexdigest(), mode, opcodes_tag, filename)
+
+
+def test_expr__CACHED(expr, opcodes_tag, mode="eval", filename=None):
+    """Same as ``test_expr``, but returns a cached code object when possible"""
+    if mode == 'eval':
+        expr = expr.strip()
+    key = _code_cache_key(expr, mode, opcodes_tag, filename)
+    with _CODE_CACHE_LOCK:
+        code_obj = _CODE_CACHE.get(key)
+        if code_obj is not None:
+            _CODE_CACHE.move_to_end(key)
+            return code_obj
+    # compile outside of the lock: it may take a while for a big code
+    code_obj = _TEST_EXPR[opcodes_tag](expr, mode=mode, filename=filename)
+    with _CODE_CACHE_LOCK:
+        _CODE_CACHE[key] = code_obj
+        while len(_CODE_CACHE) > CODE_CACHE_SIZE:
+            _CODE_CACHE.popitem(last=False)
+    return code_obj
+
+
+def clear_code_cache():
+    """Drop all cached code objects of the worker"""
+    with _CODE_CACHE_LOCK:
+        _CODE_CACHE.clear()
+
+
+def _safe_eval__CACHED(builtins, opcodes_tag, expr, globals_dict=None, locals_dict=None, mode="eval", nocopy=False, filename=None):
+    if type(expr) is CodeType:
+        raise TypeError("safe_eval does not allow direct evaluation of code objects.")
+
+    if not nocopy:
+        if globals_dict is not None:
+            globals_dict = dict(globals_dict)
+        if locals_dict is not None:
+            locals_dict = dict(locals_dict)
+
+    check_values(globals_dict)
+    check_values(locals_dict)
+
+    if globals_dict is None:
+        globals_dict = {}
+
+    globals_dict['__builtins__'] = builtins
+    c = test_expr__CACHED(expr, opcodes_tag, mode=mode, filename=filename)
+    try:
+        return unsafe_eval(c, globals_dict, locals_dict)
+    except odoo.exceptions.UserError:
+        raise
+    except odoo.exceptions.RedirectWarning:
+        raise
+    except werkzeug.exceptions.HTTPException:
+        raise
+    except OperationalError:
+        raise
+    except ZeroDivisionError:
+        raise
+    except Exception as e:
+        raise ValueError('%s: "%s" while evaluating\n%r' % (ustr(type(e)), ustr(e), expr))
+
+
+def safe_eval__CACHED(expr, globals_dict=None, locals_dict=None, mode="eval", nocopy=False, filename=None):
+    """Cached version of ``odoo.tools.safe_eval.safe_eval``"""
+    return _safe_eval__CACHED(
+        odoo_safe_eval._BUILTINS, "safe",
+        expr, globals_dict, locals_dict, mode=mode, nocopy=nocopy, filename=filename,
+    )
+
+
+def safe_eval__MAGIC__CACHED(expr, globals_dict=None, locals_dict=None, mode="eval", nocopy=False, filename=None):
+    """Cached version of ``safe_eval__MAGIC``"""
+    return _safe_eval__CACHED(
+        _BUILTINS, "magic",
+        expr, globals_dict, locals_dict, mode=mode, nocopy=nocopy, filename=filename,
+    )
+
+
 def check_values(d):
     if not d:
         return d
@@ -0,0 +1,12 @@
+# License MIT (https://opensource.org/licenses/MIT).
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    jobs = env["sync.job"].with_context(active_test=False).search([])
+    # Counters of existing jobs, then their state
+    jobs._recount_logs()
+    env.add_to_compute(jobs._fields["state"], jobs)
+    env.add_to_compute(jobs._fields["in_progress"], jobs)
+    env.flush_all()
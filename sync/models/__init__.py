@@ -17,3 +17,4 @@ from . import ir_actions
 from . import ir_attachment
 from . import sync_link
 from . import base
+from . import queue_job
@@ -3,6 +3,8 @@
 
 from odoo import _, exceptions, models
 
+from .sync_link import EXTERNAL, ODOO
+
 
 class Base(models.AbstractModel):
     _inherit = "base"
@@ -19,6 +21,50 @@ class Base(models.AbstractModel):
             ._search_links_odoo(self, relation_name, refs)
         )
 
+    def get_links_many(self, relation_name, refs):
+        """Find links of the model for many external references at once.
+
+        Returns dictionary: external ref -> links
+        """
+        return (
+            self.env["sync.link"]
+            .with_context(sync_link_odoo_model=self._name)
+            ._get_links_many(relation_name, EXTERNAL, refs, ODOO, model=self._name)
+        )
+
+    def set_links_many(
+        self, relation_name, pairs, sync_date=None, allow_many2many=False
+    ):
+        """Bulk version of ``set_link``.
+
+        Args:
+            pairs: list of (record or record id, external ref)
+        """
+        refs_list = [
+            {ODOO: record if isinstance(record, int) else record.id, EXTERNAL: ref}
+            for record, ref in pairs
+        ]
+        return (
+            self.env["sync.link"]
+            .with_context(sync_link_odoo_model=self._name)
+            ._set_links_many(
+                relation_name, refs_list, sync_date, allow_many2many, self._name
+            )
+        )
+
+    def _get_by_xmlid(self, code, namespace="XXX", module="__sync"):
+        """
+        Find a record created by ``_create_or_update_by_xmlid``.
+
+        Returns:
+            odoo.models.BaseModel: The record or an empty recordset.
+        """
+        xmlid_full = f"{module}.MAGIC__{namespace}__{self._table}__{code}"
+        res_id = self.env["ir.model.data"]._xmlid_to_res_id(
+            xmlid_full, raise_if_not_found=False
+        )
+        return self.browse(res_id).exists() if res_id else self.browse()
+
     def _create_or_update_by_xmlid(self, vals, code, namespace="XXX", module="__sync"):
         """
         Create or update a record by a dynamically generated XML ID.
@@ -68,6 +114,72 @@ class Base(models.AbstractModel):
             )
         return record
 
+    def _create_or_update_many_by_xmlid(
+        self, vals_by_code, namespace="XXX", module="__sync"
+    ):
+        """
+        Batch version of ``_create_or_update_by_xmlid``: XML IDs are resolved with
+        a single query, missing records and their XML IDs are created at once.
+
+        Args:
+            vals_by_code (dict): Field values by the unique part of the XML ID.
+            namespace (str, optional): Additional unique part of the XML IDs.
+            module (str, optional): The module name, defaults to 'sync'.
+
+        Returns:
+            dict: The records that were created or updated by the code.
+        """
+        if not vals_by_code:
+            return {}
+        data_obj = self.env["ir.model.data"]
+        xmlid_codes = {
+            code: f"MAGIC__{namespace}__{self._table}__{code}" for code in vals_by_code
+        }
+        data_records = data_obj.search(
+            [("module", "=", module), ("name", "in", list(xmlid_codes.values()))]
+        )
+        res_ids = {d.name: d.res_id for d in data_records}
+        existing_ids = set(self.browse(set(res_ids.values())).exists().ids)
+
+        records = {}
+        codes_to_create = []
+        # Records with the same values are updated with a single write
+        vals_to_write = {}
+        for code, vals in vals_by_code.items():
+            res_id = res_ids.get(xmlid_codes[code])
+            if res_id in existing_ids:
+                records[code] = self.browse(res_id)
+                key = repr(sorted(vals.items()))
+                if key in vals_to_write:
+                    vals_to_write[key][1].append(res_id)
+                else:
+                    vals_to_write[key] = (vals, [res_id])
+            else:
+                codes_to_create.append(code)
+        for vals, ids in vals_to_write.values():
+            self.browse(ids).write(vals)
+        if not codes_to_create:
+            return records
+
+        # exceptional case when data record exists, but record is deleted
+        data_records.filtered(lambda d: d.res_id not in existing_ids).unlink()
+
+        new_records = self.create([vals_by_code[code] for code in codes_to_create])
+        data_obj.create(
+            [
+                {
+                    "name": xmlid_codes[code],
+                    "module": module,
+                    "model": self._name,
+                    "res_id": record.id,
+                    "noupdate": False,
+                }
+                for code, record in zip(codes_to_create, new_records)
+            ]
+        )
+        records.update(zip(codes_to_create, new_records))
+        return records
+
     def _sync_field_name(self, property_name, property_type):
         sync_project_id = self.env.context.get("sync_project_id")
 
@@ -89,7 +201,42 @@ class Base(models.AbstractModel):
             property_value (Any): The value to assign to the property.
         """
         self.ensure_one()
+        field_name = self._sync_field(property_name, property_type)
+        self[field_name] = property_value
+
+    def _set_sync_values(self, property_name, property_type, values):
+        """
+        Batch version of ``_set_sync_value``.
+
+        Args:
+            property_name (str): Name of the property field to set.
+            property_type (str): Type of the property field.
+            values (dict): The values to assign by record id.
+        """
+        if not values:
+            return
+        field_name = self._sync_field(property_name, property_type)
+        # Records with the same value are updated with a single write. Values
+        # may be unhashable, e.g. commands for x2many fields
+        ids_by_value = {}
+        for record_id, value in values.items():
+            key = repr(value)
+            if key in ids_by_value:
+                ids_by_value[key][1].append(record_id)
+            else:
+                ids_by_value[key] = (value, [record_id])
+        for value, ids in ids_by_value.values():
+            self.browse(ids).write({field_name: value})
+
+    def _sync_field(self, property_name, property_type):
+        """Returns name of the property field. Creates the field if needed."""
         field_name = self._sync_field_name(property_name, property_type)
+        # Registry is reloaded on creating a field, so it works as a cache
+        # of the existing fields
+        field = self._fields.get(field_name)
+        if field and field.type == property_type:
+            return field_name
+
         field = self.env["ir.model.fields"].search(
             [
                 ("name", "=", field_name),
@@ -109,7 +256,7 @@ class Base(models.AbstractModel):
                     "field_description": property_name.capitalize().replace("_", " "),
                 }
             )
-        self[field_name] = property_value
+        return field_name
 
     def _get_sync_value(self, property_name, property_type):
         """
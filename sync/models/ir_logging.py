@@ -8,6 +8,15 @@ LOG_INFO = "info"
 LOG_WARNING = "warning"
 LOG_ERROR = "error"
 LOG_CRITICAL = "critical"
+# ordered from the least to the most important
+LOG_LEVELS = [LOG_DEBUG, LOG_INFO, LOG_WARNING, LOG_ERROR, LOG_CRITICAL]
+LOG_LEVEL_SELECTION = [
+    (LOG_DEBUG, "Debug"),
+    (LOG_INFO, "Info"),
+    (LOG_WARNING, "Warning"),
+    (LOG_ERROR, "Error"),
+    (LOG_CRITICAL, "Critical"),
+]
 
 SHORT_MESSAGE_LINES = 5
 SHORT_MESSAGE_CHARS = 100
@@ -16,7 +25,7 @@ SHORT_MESSAGE_CHARS = 100
 class IrLogging(models.Model):
     _inherit = "ir.logging"
 
-    sync_job_id = fields.Many2one("sync.job", ondelete="cascade")
+    sync_job_id = fields.Many2one("sync.job", ondelete="cascade", index=True)
     sync_task_id = fields.Many2one("sync.task", related="sync_job_id.task_id")
     sync_project_id = fields.Many2one(
         "sync.project", related="sync_job_id.task_id.project_id"
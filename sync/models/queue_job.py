@@ -0,0 +1,18 @@
+# License MIT (https://opensource.org/licenses/MIT).
+
+from odoo import models
+
+from odoo.addons.queue_job.job import FAILED, PENDING
+
+
+class QueueJob(models.Model):
+    _inherit = "queue.job"
+
+    def write(self, vals):
+        res = super().write(vals)
+        if vals.get("state") in [PENDING, FAILED]:
+            # The job transaction is rolled back on failure or retry
+            self.env["sync.job"].sudo().search(
+                [("queue_job_id", "in", self.ids)]
+            )._recount_logs()
+        return res
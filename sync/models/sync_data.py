@@ -1,12 +1,52 @@
 # Copyright 2024 Ivan Yelizariev <https://twitter.com/yelizariev>
 import base64
 import csv
+import io
 import json
+import pickle
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from io import StringIO
 
 import yaml
 
 from odoo import api, fields, models
+from odoo.tools import split_every
+
+# Per-worker LRU cache of parsed data files:
+# (checksum, parser, args) -> pickled result.
+# Results are stored pickled, so every call gets its own copy
+# and task code cannot modify cached values.
+PARSED_CACHE_MAX_SIZE = 64 * 1024 * 1024  # bytes
+_parsed_cache = OrderedDict()
+_parsed_cache_size = [0]
+_parsed_cache_lock = threading.Lock()
+
+
+def _parsed_cache_get(key):
+    with _parsed_cache_lock:
+        data = _parsed_cache.get(key)
+        if data is None:
+            return None
+        _parsed_cache.move_to_end(key)
+    return pickle.loads(data)
+
+
+def _parsed_cache_set(key, value):
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > PARSED_CACHE_MAX_SIZE // 4:
+        # too big to keep it
+        return
+    with _parsed_cache_lock:
+        old = _parsed_cache.pop(key, None)
+        if old is not None:
+            _parsed_cache_size[0] -= len(old)
+        _parsed_cache[key] = data
+        _parsed_cache_size[0] += len(data)
+        while _parsed_cache_size[0] > PARSED_CACHE_MAX_SIZE:
+            _key, evicted = _parsed_cache.popitem(last=False)
+            _parsed_cache_size[0] -= len(evicted)
 
 
 class SyncData(models.Model):
@@ -14,6 +54,7 @@ class SyncData(models.Model):
     _description = "Sync Data File"
 
     name = fields.Char("Technical name")
+    active = fields.Boolean(default=True)
     project_id = fields.Many2one("sync.project", ondelete="cascade")
     file_name = fields.Char("File Name")
     file_content = fields.Binary("File Content")
@@ -28,22 +69,124 @@ class SyncData(models.Model):
             else:
                 record.text = False
 
+    def _get_checksum(self):
+        self.ensure_one()
+        attachment = (
+            self.env["ir.attachment"]
+            .sudo()
+            .search_read(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", "file_content"),
+                    ("res_id", "=", self.id),
+                ],
+                ["checksum"],
+                limit=1,
+            )
+        )
+        return attachment[0]["checksum"] if attachment else None
+
+    def _parse_cached(self, parser, parse, args=(), kwargs=None):
+        """Return result of ``parse()`` from cache if the file is not changed"""
+        checksum = self._get_checksum()
+        if not checksum:
+            return parse()
+        key = (checksum, parser, repr(args), repr(sorted((kwargs or {}).items())))
+        res = _parsed_cache_get(key)
+        if res is None:
+            res = parse()
+            _parsed_cache_set(key, res)
+        return res
+
+    # Parsers below check the cache before reading the file content
+
     def csv(self, *args, **kwargs):
         """Parse CSV file from binary field."""
-        if self.file_content:
-            file_like_object = StringIO(self.text)
-            reader = csv.DictReader(file_like_object, *args, **kwargs)
-            return [row for row in reader]
-        return []
+
+        def parse():
+            if self.file_content:
+                file_like_object = StringIO(self.text)
+                reader = csv.DictReader(file_like_object, *args, **kwargs)
+                return [row for row in reader]
+            return []
+
+        return self._parse_cached("csv", parse, args, kwargs)
 
     def json(self):
         """Parse JSON file from binary field."""
-        if self.file_content:
-            return json.loads(self.text)
-        return {}
+
+        def parse():
+            if self.file_content:
+                return json.loads(self.text)
+            return {}
+
+        return self._parse_cached("json", parse)
 
     def yaml(self):
         """Parse YAML file from binary field."""
-        if self.file_content:
-            return yaml.safe_load(self.text)
-        return None
+
+        def parse():
+            if self.file_content:
+                return yaml.safe_load(self.text)
+            return None
+
+        return self._parse_cached("yaml", parse)
+
+    # Streaming readers
+    #
+    # Read the file directly from the filestore instead of decoding the whole
+    # content in memory. Can be passed to sync helpers as src_list.
+    @contextmanager
+    def _open_text(self):
+        """Open file content as a text stream"""
+        self.ensure_one()
+        attachment = (
+            self.env["ir.attachment"]
+            .sudo()
+            .search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", "file_content"),
+                    ("res_id", "=", self.id),
+                ],
+                limit=1,
+            )
+        )
+        if attachment.store_fname:
+            binary = open(attachment._full_path(attachment.store_fname), "rb")
+        else:
+            # content is stored in database
+            binary = io.BytesIO(attachment.raw or b"")
+        with binary, io.TextIOWrapper(binary, encoding="utf-8", newline="") as text:
+            yield text
+
+    def _iter_chunks(self, items, chunk_size):
+        if chunk_size:
+            return split_every(chunk_size, items, list)
+        return items
+
+    def _iter_csv(self, *args, **kwargs):
+        with self._open_text() as text:
+            yield from csv.DictReader(text, *args, **kwargs)
+
+    def _iter_jsonl(self):
+        with self._open_text() as text:
+            for line in text:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _iter_yaml(self):
+        with self._open_text() as text:
+            yield from yaml.safe_load_all(text)
+
+    def iter_csv(self, *args, chunk_size=None, **kwargs):
+        """Iterate over rows of CSV file. Yields lists of rows if chunk_size is set."""
+        return self._iter_chunks(self._iter_csv(*args, **kwargs), chunk_size)
+
+    def iter_jsonl(self, chunk_size=None):
+        """Iterate over objects of JSON Lines file. Yields lists of objects if chunk_size is set."""
+        return self._iter_chunks(self._iter_jsonl(), chunk_size)
+
+    def iter_yaml(self, chunk_size=None):
+        """Iterate over documents of multi-document YAML file. Yields lists of documents if chunk_size is set."""
+        return self._iter_chunks(self._iter_yaml(), chunk_size)
@@ -27,7 +27,9 @@ class SyncJob(models.Model):
 
     trigger_name = fields.Char(compute="_compute_trigger_name", store=True)
     trigger_cron_id = fields.Many2one("sync.trigger.cron", readonly=True)
-    trigger_automation_id = fields.Many2one("sync.trigger.automation", readonly=True)
+    trigger_automation_id = fields.Many2one(
+        "sync.trigger.automation", readonly=True, index=True
+    )
     trigger_webhook_id = fields.Many2one("sync.trigger.webhook", readonly=True)
     trigger_button_id = fields.Many2one("sync.trigger.button", readonly=True)
     task_id = fields.Many2one(
@@ -39,8 +41,16 @@ class SyncJob(models.Model):
     parent_job_id = fields.Many2one("sync.job", readonly=True, ondelete="cascade")
     job_ids = fields.One2many("sync.job", "parent_job_id", "Sub jobs", readonly=True)
     log_ids = fields.One2many("ir.logging", "sync_job_id", readonly=True)
-    log_count = fields.Integer(compute="_compute_log_count")
-    queue_job_id = fields.Many2one("queue.job", string="Queue Job", readonly=True)
+    # Counters are updated when the log function of the job is closed,
+    # see _add_log_counts
+    log_count = fields.Integer(readonly=True)
+    error_count = fields.Integer(
+        readonly=True, help="Number of logs with level Error or Critical"
+    )
+    warning_count = fields.Integer(readonly=True)
+    queue_job_id = fields.Many2one(
+        "queue.job", string="Queue Job", readonly=True, index=True
+    )
     queue_job_state = fields.Selection(
         related="queue_job_id.state", readonly=True, string="Queue Job State"
     )
@@ -60,9 +70,11 @@ class SyncJob(models.Model):
             (FAILED, "Failed"),
         ],
         compute="_compute_state",
+        store=True,
     )
     in_progress = fields.Boolean(
         compute="_compute_state",
+        store=True,
     )
 
     @api.depends("queue_job_id.max_retries")
@@ -74,15 +86,20 @@ class SyncJob(models.Model):
             else:
                 r.max_retries_str = str(max_retries)
 
-    @api.depends("queue_job_id.state", "job_ids.queue_job_id.state", "log_ids.level")
+    @api.depends(
+        "queue_job_id.state",
+        "error_count",
+        "warning_count",
+        "job_ids.state",
+        "job_ids.in_progress",
+    )
     def _compute_state(self):
         for r in self:
-            jobs = r + r.job_ids
-            states = [q.state for q in jobs.mapped("queue_job_id")]
-            levels = {log.level for log in jobs.mapped("log_ids")}
+            # sub jobs are taken into account via their stored state
+            states = r.queue_job_id.mapped("state") + r.job_ids.mapped("state")
             computed_state = DONE
-            has_errors = any(lev in [LOG_CRITICAL, LOG_ERROR] for lev in levels)
-            has_warnings = any(lev == LOG_WARNING for lev in levels)
+            has_errors = r.error_count
+            has_warnings = r.warning_count or DONE_WARNING in states
             for s in [FAILED, STARTED, ENQUEUED, PENDING]:
                 if any(s == ss for ss in states):
                     computed_state = s
@@ -93,12 +110,92 @@ class SyncJob(models.Model):
                 computed_state = DONE_WARNING
 
             r.state = computed_state
-            r.in_progress = any(s in [PENDING, ENQUEUED, STARTED] for s in states)
-
-    @api.depends("log_ids")
-    def _compute_log_count(self):
+            r.in_progress = r.queue_job_id.state in [
+                PENDING,
+                ENQUEUED,
+                STARTED,
+            ] or any(r.job_ids.mapped("in_progress"))
+
+    @api.model
+    def _read_counts(self, groupby, ids):
+        """Number of jobs and their logs for each value of the groupby field.
+
+        Returns dictionary: id -> (job_count, log_count)
+        """
+        ids = [i for i in ids if isinstance(i, int)]
+        if not ids:
+            return {}
+        groups = self.with_context(active_test=False).read_group(
+            [(groupby, "in", ids)], ["log_count:sum"], [groupby]
+        )
+        return {
+            g[groupby][0]: (g[groupby + "_count"], g["log_count"] or 0) for g in groups
+        }
+
+    def _add_log_counts(self, levels):
+        """Increment counters by the levels of logs written since the last call.
+
+        The log function calls it when it's closed at the end of the run, so
+        the state of the job and its parents is recomputed once rather than on
+        every log. Logs written after that are counted right away.
+        """
+        self.ensure_one()
+        if not levels:
+            return
+        errors = sum(1 for lev in levels if lev in [LOG_CRITICAL, LOG_ERROR])
+        warnings = sum(1 for lev in levels if lev == LOG_WARNING)
+        fnames = ["log_count", "error_count", "warning_count"]
+        self.flush_recordset(fnames)
+        self.env.cr.execute(
+            """
+            UPDATE sync_job SET
+                log_count = COALESCE(log_count, 0) + %s,
+                error_count = COALESCE(error_count, 0) + %s,
+                warning_count = COALESCE(warning_count, 0) + %s
+            WHERE id = %s
+            """,
+            (len(levels), errors, warnings, self.id),
+        )
+        self.invalidate_recordset(fnames)
+        self.modified(fnames)
+
+    def _recount_logs(self):
+        """Count logs from scratch.
+
+        Logs are written in a separate transaction, so they are kept when the
+        job transaction is rolled back, while the counters are not.
+        """
+        if not self:
+            return
+        self.env["ir.logging"].flush_model(["sync_job_id", "level"])
+        self.env.cr.execute(
+            """
+            SELECT
+                sync_job_id,
+                count(*),
+                count(*) FILTER (WHERE level IN %s),
+                count(*) FILTER (WHERE level = %s)
+            FROM ir_logging
+            WHERE sync_job_id IN %s
+            GROUP BY sync_job_id
+            """,
+            ((LOG_CRITICAL, LOG_ERROR), LOG_WARNING, tuple(self.ids)),
+        )
+        counts = {row[0]: row[1:] for row in self.env.cr.fetchall()}
         for r in self:
-            r.log_count = len(r.log_ids)
+            log_count, error_count, warning_count = counts.get(r.id, (0, 0, 0))
+            if (log_count, error_count, warning_count) != (
+                r.log_count,
+                r.error_count,
+                r.warning_count,
+            ):
+                r.write(
+                    {
+                        "log_count": log_count,
+                        "error_count": error_count,
+                        "warning_count": warning_count,
+                    }
+                )
 
     @api.depends("parent_job_id", *TRIGGER_FIELDS)
     def _compute_sync_task_id(self):
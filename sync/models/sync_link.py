@@ -2,9 +2,11 @@
 # License MIT (https://opensource.org/licenses/MIT).
 
 import logging
+from collections import defaultdict
 
 from odoo import api, fields, models, tools
 from odoo.exceptions import ValidationError
+from odoo.tools import split_every
 from odoo.tools.translate import _
 
 from .ir_logging import LOG_DEBUG
@@ -15,6 +17,18 @@ ODOO = "__odoo__"
 ODOO_REF = "ref2"
 EXTERNAL = "__external__"
 EXTERNAL_REF = "ref1"
+# max number of references in a single query of bulk methods
+LINKS_CHUNK_SIZE = 1000
+# changing these fields makes job-scoped link cache outdated
+LINK_KEY_FIELDS = (
+    "project_id",
+    "relation",
+    "system1",
+    "system2",
+    "ref1",
+    "ref2",
+    "model",
+)
 
 
 class SyncLink(models.Model):
@@ -43,8 +57,118 @@ class SyncLink(models.Model):
             self._table,
             ["project_id", "relation", "system1", "system2", "ref1", "ref2", "model"],
         )
+        # Lookups by reference of one of the systems, e.g. get_link (external ->
+        # odoo) and search_links (odoo -> external)
+        tools.create_index(
+            self._cr,
+            "sync_link_ref1_index",
+            self._table,
+            ["project_id", "relation", "system1", "ref1"],
+        )
+        tools.create_index(
+            self._cr,
+            "sync_link_ref2_index",
+            self._table,
+            ["project_id", "relation", "system2", "ref2"],
+        )
         return res
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        links = super().create(vals_list)
+        links._update_link_cache()
+        return links
+
+    def write(self, vals):
+        if any(f in vals for f in LINK_KEY_FIELDS):
+            self._clear_link_cache()
+        return super().write(vals)
+
+    # Job-scoped cache
+    #
+    # Dictionary in the context key ``sync_link_cache`` maps
+    # (project_id, relation, system1, system2, ref_field, ref, model) to link ids.
+    # The dictionary is created per job, see sync.project::_get_eval_context
+    @api.model
+    def _get_link_cache(self):
+        return self.env.context.get("sync_link_cache")
+
+    @api.model
+    def _link_cache_key(self, relation, system1, system2, ref_field, ref, model):
+        project_id = self.env.context.get("sync_project_id")
+        return (project_id, relation, system1, system2, ref_field, ref, model)
+
+    @api.model
+    def _search_links_cached(self, relation, vals, model=None):
+        """Search links by scalar references using the job-scoped cache.
+
+        Returns None if the cache is not available or cannot be used for the
+        given references (e.g. list of references)."""
+        cache = self._get_link_cache()
+        if cache is None:
+            return None
+        ref_fields = [k for k in ("ref1", "ref2") if vals[k]]
+        if not ref_fields or any(isinstance(vals[k], list) for k in ref_fields):
+            return None
+        ref_field = ref_fields[0]
+        key = self._link_cache_key(
+            relation,
+            vals["system1"],
+            vals["system2"],
+            ref_field,
+            vals[ref_field],
+            model,
+        )
+        link_ids = cache.get(key)
+        if link_ids is None:
+            domain = [
+                ("relation", "=", relation),
+                ("project_id", "=", self.env.context.get("sync_project_id")),
+                ("system1", "=", vals["system1"]),
+                ("system2", "=", vals["system2"]),
+                (ref_field, "=", vals[ref_field]),
+            ]
+            if model:
+                domain.append(("model", "=", model))
+            link_ids = cache[key] = tuple(self.search(domain).ids)
+        links = self.browse(link_ids)
+        for k in ref_fields[1:]:
+            links = links.filtered(lambda r, k=k: r[k] == vals[k])
+        return links
+
+    def _update_link_cache(self):
+        cache = self._get_link_cache()
+        if not cache:
+            return
+        project_id = self.env.context.get("sync_project_id")
+        project_id = str(project_id) if project_id else False
+        for r in self:
+            if r.project_id != project_id:
+                continue
+            for ref_field in ("ref1", "ref2"):
+                for model in {None, r.model or None}:
+                    key = self._link_cache_key(
+                        r.relation, r.system1, r.system2, ref_field, r[ref_field], model
+                    )
+                    if key in cache:
+                        # keep the "id desc" order
+                        cache[key] = (r.id,) + cache[key]
+
+    @api.model
+    def _clear_link_cache(self):
+        cache = self._get_link_cache()
+        if cache:
+            cache.clear()
+
+    @api.model
+    def _log_enabled(self, level=LOG_DEBUG):
+        """Check whether a message is going to be saved before preparing it"""
+        log = self.env.context.get("log_function")
+        if not log:
+            return False
+        is_enabled = getattr(log, "is_enabled", None)
+        return not is_enabled or is_enabled(level)
+
     @api.model
     def _log(self, *args, **kwargs):
         log = self.env.context.get("log_function")
@@ -115,7 +239,8 @@ class SyncLink(models.Model):
                 )
 
         if existing:
-            self._log("{} Use existing link: {}".format(relation, vals))
+            if self._log_enabled():
+                self._log("{} Use existing link: {}".format(relation, vals))
             existing.update_links(sync_date)
             return existing
 
@@ -124,7 +249,8 @@ class SyncLink(models.Model):
         vals["relation"] = relation
         if model:
             vals["model"] = model
-        self._log("Create link: %s" % vals)
+        if self._log_enabled():
+            self._log("Create link: %s" % vals)
         return self.create(vals)
 
     @api.model
@@ -136,7 +262,8 @@ class SyncLink(models.Model):
                     "get_link found multiple links. Use search_links for many2many relations"
                 )
             )
-        self._log("Get link: {} {} -> {}".format(relation, external_refs, links))
+        if self._log_enabled():
+            self._log("Get link: {} {} -> {}".format(relation, external_refs, links))
         return links
 
     @api.model
@@ -155,8 +282,10 @@ class SyncLink(models.Model):
                 continue
             operator = "in" if isinstance(v, list) else "="
             domain.append((k, operator, v))
-        links = self.search(domain)
-        if make_logs:
+        links = self._search_links_cached(relation, vals, model=model)
+        if links is None:
+            links = self.search(domain)
+        if make_logs and self._log_enabled():
             self._log("Search links: {} -> {}".format(domain, links))
         return links
 
@@ -214,6 +343,146 @@ class SyncLink(models.Model):
             relation, refs, model=records._name, make_logs=True
         )
 
+    # Bulk API
+    @api.model
+    def _get_links_many(self, relation, system, refs, other_system, model=None):
+        """Find links for many references of the same system at once.
+
+        Returns dictionary: ref -> links. References without links are
+        not presented in the result.
+        """
+        system1, system2 = sorted([system, other_system])
+        ref_field = "ref1" if system1 == system else "ref2"
+        str2ref = {str(ref): ref for ref in refs}
+        cache = self._get_link_cache()
+        res = {}
+        for chunk in split_every(LINKS_CHUNK_SIZE, list(str2ref)):
+            domain = [
+                ("relation", "=", relation),
+                ("project_id", "=", self.env.context.get("sync_project_id")),
+                ("system1", "=", system1),
+                ("system2", "=", system2),
+                (ref_field, "in", list(chunk)),
+            ]
+            if model:
+                domain.append(("model", "=", model))
+            links_by_ref = defaultdict(list)
+            for link in self.search(domain):
+                links_by_ref[link[ref_field]].append(link.id)
+            for str_ref in chunk:
+                link_ids = tuple(links_by_ref.get(str_ref, ()))
+                if cache is not None:
+                    key = self._link_cache_key(
+                        relation, system1, system2, ref_field, str_ref, model
+                    )
+                    cache[key] = link_ids
+                if link_ids:
+                    res[str2ref[str_ref]] = self.browse(link_ids)
+        if self._log_enabled():
+            self._log(
+                "Get links: {} {}->{}: found {} of {}".format(
+                    relation, system, other_system, len(res), len(str2ref)
+                )
+            )
+        return res
+
+    @api.model
+    def _set_links_many(
+        self, relation, refs_list, sync_date=None, allow_many2many=False, model=None
+    ):
+        """Bulk version of _set_link_external.
+
+        Checks existing links with a few queries and creates new links with a
+        single ``create`` call. Raises the same ValidationError as
+        _set_link_external would raise for the first conflicting item.
+
+        Returns links in the order of ``refs_list``.
+        """
+        project_id = self.env.context.get("sync_project_id")
+        vals_list = [self.refs2vals(refs) for refs in refs_list]
+        by_systems = defaultdict(list)
+        for vals in vals_list:
+            by_systems[(vals["system1"], vals["system2"])].append(vals)
+
+        # Existing links by (system1, system2, ref_field, ref)
+        known = defaultdict(list)
+        for (system1, system2), group in by_systems.items():
+            refs1 = list({vals["ref1"] for vals in group})
+            refs2 = list({vals["ref2"] for vals in group})
+            chunks = max(len(refs1), len(refs2))
+            for i in range(0, chunks, LINKS_CHUNK_SIZE):
+                chunk1 = refs1[i : i + LINKS_CHUNK_SIZE]
+                chunk2 = refs2[i : i + LINKS_CHUNK_SIZE]
+                domain = [
+                    ("relation", "=", relation),
+                    ("project_id", "=", project_id),
+                    ("system1", "=", system1),
+                    ("system2", "=", system2),
+                    "|",
+                    ("ref1", "in", chunk1),
+                    ("ref2", "in", chunk2),
+                ]
+                for link in self.search(domain):
+                    item = (link.ref1, link.ref2, link)
+                    known[(system1, system2, "ref1", link.ref1)].append(item)
+                    known[(system1, system2, "ref2", link.ref2)].append(item)
+
+        result = []
+        existing = self.browse()
+        new_vals_list = []
+        for vals in vals_list:
+            systems = (vals["system1"], vals["system2"])
+            by_ref1 = known[systems + ("ref1", vals["ref1"])]
+            by_ref2 = known[systems + ("ref2", vals["ref2"])]
+            same = [
+                item
+                for item in by_ref1
+                if item[0] == vals["ref1"] and item[1] == vals["ref2"]
+            ]
+            if not allow_many2many:
+                # same rules as in _set_link_external
+                candidates = by_ref1 or by_ref2
+                conflict = [
+                    item
+                    for item in candidates
+                    if not (item[0] == vals["ref1"] and item[1] == vals["ref2"])
+                ]
+                if conflict:
+                    ref1, ref2, _link = conflict[0]
+                    raise ValidationError(
+                        _("%s link already exists: %s=%s, %s=%s")
+                        % (relation, systems[0], ref1, systems[1], ref2)
+                    )
+            if same:
+                # link exists or is already planned to be created
+                result.append(same[0][2])
+                if not isinstance(same[0][2], int):
+                    existing |= same[0][2]
+                continue
+
+            new_vals = dict(vals, relation=relation, project_id=project_id)
+            if sync_date:
+                new_vals["date"] = sync_date
+            if model:
+                new_vals["model"] = model
+            # index of the link to be created
+            item = (vals["ref1"], vals["ref2"], len(new_vals_list))
+            new_vals_list.append(new_vals)
+            by_ref1.append(item)
+            by_ref2.append(item)
+            result.append(item[2])
+
+        if existing:
+            if self._log_enabled():
+                self._log("{} Use existing links: {}".format(relation, len(existing)))
+            existing.update_links(sync_date)
+        if self._log_enabled():
+            self._log("Create links: {} {}".format(relation, len(new_vals_list)))
+        created = self.create(new_vals_list) if new_vals_list else self.browse()
+        return self.browse(
+            [created[r].id if isinstance(r, int) else r.id for r in result]
+        )
+
     # Common API
     def _get_link(self, rel, ref_info, model=None):
         if isinstance(ref_info, dict):
@@ -239,7 +508,9 @@ class SyncLink(models.Model):
         return (self | other) - (self & other)
 
     def unlink(self):
-        self._log("Delete links: %s" % self)
+        if self._log_enabled():
+            self._log("Delete links: %s" % self)
+        self._clear_link_cache()
         return super(SyncLink, self).unlink()
 
     @api.model
@@ -263,8 +534,29 @@ class SyncLink(models.Model):
         def get_link(rel, ref_info, model=None):
             return env["sync.link"]._get_link(rel, ref_info, model=model)
 
+        def get_links_many(rel, system, refs, other_system=None, model=None):
+            if other_system is None:
+                # Odoo links: refs are either Odoo IDs or external references
+                if system == "odoo":
+                    system, other_system = ODOO, EXTERNAL
+                else:
+                    system, other_system = EXTERNAL, ODOO
+            return env["sync.link"]._get_links_many(
+                rel, system, refs, other_system, model=model
+            )
+
+        def set_links_many(
+            rel, refs_list, sync_date=None, allow_many2many=False, model=None
+        ):
+            # Works for external links only
+            return env["sync.link"]._set_links_many(
+                rel, refs_list, sync_date, allow_many2many, model
+            )
+
         return {
             "set_link": set_link,
             "search_links": search_links,
             "get_link": get_link,
+            "get_links_many": get_links_many,
+            "set_links_many": set_links_many,
         }
@@ -8,23 +8,29 @@ import csv
 import io
 import logging
 import os
+import threading
+import time as time_module
+from collections import defaultdict
 from datetime import datetime
 from hashlib import sha256
 from itertools import groupby
 from operator import itemgetter
 
-import urllib3
 from pytz import timezone
 
 from odoo import api, fields, models
 from odoo.exceptions import AccessError, UserError, ValidationError
-from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT, html2plaintext
+from odoo.tools import (
+    DEFAULT_SERVER_DATETIME_FORMAT,
+    config,
+    html2plaintext,
+    split_every,
+)
 from odoo.tools.misc import get_lang
 from odoo.tools.safe_eval import (
     datetime as safe_datetime,
     dateutil,
     json,
-    safe_eval,
     test_python_expr,
     time,
 )
@@ -32,7 +38,11 @@ from odoo.tools.translate import _
 
 from odoo.addons.queue_job.exception import RetryableJobError
 
-from ..lib.tools.safe_eval import safe_eval__MAGIC, test_python_expr__MAGIC
+from ..lib.tools.safe_eval import (
+    safe_eval__CACHED,
+    safe_eval__MAGIC__CACHED,
+    test_python_expr__MAGIC,
+)
 from ..tools import (
     AttrDict,
     add_items,
@@ -41,14 +51,29 @@ from ..tools import (
     extract_yaml_from_markdown,
     extract_yaml_from_python,
     fetch_gist_data,
+    fetch_raw_files,
     has_function_defined,
+    read_source_files,
     url2base64,
     url2bin,
 )
-from .ir_logging import LOG_CRITICAL, LOG_DEBUG, LOG_ERROR, LOG_INFO, LOG_WARNING
+from .ir_logging import (
+    LOG_CRITICAL,
+    LOG_DEBUG,
+    LOG_ERROR,
+    LOG_INFO,
+    LOG_LEVEL_SELECTION,
+    LOG_LEVELS,
+    LOG_WARNING,
+)
 
 _logger = logging.getLogger(__name__)
 DEFAULT_LOG_NAME = "Log"
+LOG_INSERT_CHUNK = 1000
+
+# Per-worker storage of evaluation context snapshots. Thread-local, because
+# per-job values are bound to a snapshot in place.
+EVAL_CONTEXT_SNAPSHOTS = threading.local()
 
 
 def eval_export(eval_function, code, eval_context):
@@ -76,13 +101,75 @@ class SyncProject(models.Model):
 
     source_url = fields.Char(
         "Source",
-        help="Paste link to gist page, e.g. https://gist.github.com/yelizariev/e0585a0817c4d87b65b8a3d945da7ca2",
+        help="Paste link to gist page, e.g. https://gist.github.com/yelizariev/e0585a0817c4d87b65b8a3d945da7ca2\n"
+        "Alternatively, specify path to a directory or a zip/tar archive on the server. "
+        "Such path must be inside one of the directories listed in the option "
+        "sync_source_path of the server configuration.",
+    )
+    source_file = fields.Binary(
+        "Source Archive",
+        attachment=True,
+        copy=False,
+        help="Zip or tar archive with the project files. Used instead of the Source.",
     )
+    source_file_name = fields.Char(copy=False)
     source_updated_at = fields.Datetime("Version", readonly=True)
+    source_hashes = fields.Text(
+        readonly=True,
+        copy=False,
+        help="Hashes of the source files used at the last upgrade",
+    )
+    source_upgrade_summary = fields.Char("Last Upgrade", readonly=True, copy=False)
     description = fields.Html(readonly=True)
 
     core_code = fields.Text(string="Core Code", readonly=True)
     common_code = fields.Text("Project Library Code")
+    eval_context_cache = fields.Boolean(
+        "Reuse Evaluation Context",
+        help="Execute Core and Library code once per worker and reuse the result "
+        "until the project, its parameters, secrets, templates, data files or "
+        "webhooks are updated. Top-level code of Core and Library must not keep "
+        "references to MAGIC.env, MAGIC.log and other per-job values.",
+    )
+    log_level = fields.Selection(
+        LOG_LEVEL_SELECTION,
+        string="Minimal Log Level",
+        default=LOG_INFO,
+        required=True,
+        help="Log records with lower level are not saved. Can be overridden in Tasks.",
+    )
+    log_buffer_size = fields.Integer(
+        "Log Buffer Size",
+        default=0,
+        help="Collect up to this number of log records in memory and write them "
+        "with a single query. Logs are also written on errors and at the end of "
+        "the job. Zero means writing every log record immediately.",
+    )
+    log_buffer_interval = fields.Integer(
+        "Log Buffer Interval",
+        default=5,
+        help="Maximum number of seconds to keep log records in the buffer",
+    )
+    job_channel = fields.Char(
+        "Queue Channel",
+        help="Channel of the asynchronous jobs, e.g. root.sync. "
+        "Capacity of the channel is set in the server configuration. "
+        "Leave empty to use the default channel.",
+    )
+    job_priority = fields.Integer(
+        "Job Priority",
+        default=10,
+        help="Priority of the asynchronous jobs, 0 being the higher priority",
+    )
+    job_max_parallel = fields.Integer(
+        "Max Parallel Jobs",
+        help="Jobs above this number are postponed. Zero means no limit.",
+    )
+    job_eta_spread = fields.Integer(
+        "Spread Jobs",
+        help="Postpone every new asynchronous job by a random number of seconds "
+        "up to this value",
+    )
 
     param_ids = fields.One2many(
         "sync.project.param", "project_id", copy=True, string="Parameters"
@@ -117,7 +204,7 @@ class SyncProject(models.Model):
     job_ids = fields.One2many("sync.job", "project_id")
     job_count = fields.Integer(compute="_compute_job_count")
     log_ids = fields.One2many("ir.logging", "sync_project_id")
-    log_count = fields.Integer(compute="_compute_log_count")
+    log_count = fields.Integer(compute="_compute_job_count")
     link_ids = fields.One2many("sync.link", "project_id")
     link_count = fields.Integer(compute="_compute_link_count")
     data_ids = fields.One2many("sync.data", "project_id")
@@ -136,30 +223,47 @@ class SyncProject(models.Model):
         for r in self:
             r.network_access_readonly = r.sudo().network_access
 
-    @api.depends("task_ids")
     def _compute_task_count(self):
+        groups = (
+            self.env["sync.task"]
+            .with_context(active_test=False)
+            .read_group([("project_id", "in", self.ids)], [], ["project_id"])
+        )
+        counts = {g["project_id"][0]: g["project_id_count"] for g in groups}
         for r in self:
-            r.task_count = len(r.with_context(active_test=False).task_ids)
+            r.task_count = counts.get(r.id, 0)
 
     @api.depends("sync_order_ids")
     def _compute_sync_order_count(self):
         for r in self:
             r.sync_order_count = len(r.sync_order_ids)
 
-    @api.depends("job_ids")
     def _compute_job_count(self):
+        tasks = (
+            self.env["sync.task"]
+            .with_context(active_test=False)
+            .search([("project_id", "in", self.ids)])
+        )
+        task_counts = self.env["sync.job"]._read_counts("task_id", tasks.ids)
+        counts = defaultdict(lambda: (0, 0))
+        for task in tasks:
+            job_count, log_count = task_counts.get(task.id, (0, 0))
+            project_counts = counts[task.project_id.id]
+            counts[task.project_id.id] = (
+                project_counts[0] + job_count,
+                project_counts[1] + log_count,
+            )
         for r in self:
-            r.job_count = len(r.job_ids)
-
-    @api.depends("log_ids")
-    def _compute_log_count(self):
-        for r in self:
-            r.log_count = len(r.log_ids)
+            r.job_count, r.log_count = counts[r.id]
 
-    @api.depends("link_ids")
     def _compute_link_count(self):
+        # sync.link.project_id is a Char field
+        groups = self.env["sync.link"].read_group(
+            [("project_id", "in", [str(i) for i in self.ids])], [], ["project_id"]
+        )
+        counts = {g["project_id"]: g["project_id_count"] for g in groups}
         for r in self:
-            r.link_count = len(r.link_ids)
+            r.link_count = counts.get(str(r.id), 0)
 
     def _compute_triggers(self):
         for r in self:
@@ -189,42 +293,194 @@ class SyncProject(models.Model):
 
         return super().write(vals)
 
-    def _get_log_function(self, job, function):
+    def _get_log_function(self, job, function, log_level=None):
         self.ensure_one()
+        levels = {lev: index for index, lev in enumerate(LOG_LEVELS)}
+        min_level_index = levels[log_level or self.log_level or LOG_INFO]
+        buffer_size = self.log_buffer_size
+        buffer_interval = self.log_buffer_interval
+        buffer = []
+        state = {
+            "buffered": buffer_size > 0,
+            "flushed_at": time_module.time(),
+            # levels of logs that are not counted in the job yet
+            "levels": [],
+            "closed": False,
+        }
 
-        def _log(cr, message, level, name, log_type):
-            cr.execute(
+        def _log(cr, rows):
+            for i in range(0, len(rows), LOG_INSERT_CHUNK):
+                chunk = rows[i : i + LOG_INSERT_CHUNK]
+                cr.execute(
+                    """
+                    INSERT INTO ir_logging(create_date, create_uid, type, dbname, name, level, message, path, line, func, sync_job_id)
+                    VALUES %s
                 """
-                INSERT INTO ir_logging(create_date, create_uid, type, dbname, name, level, message, path, line, func, sync_job_id)
-                VALUES (NOW() at time zone 'UTC', %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """,
-                (
-                    self.env.uid,
-                    log_type,
-                    self._cr.dbname,
-                    name,
-                    level,
-                    message,
-                    "sync.job",
-                    job.id,
-                    function,
-                    job.id,
-                ),
-            )
+                    % ", ".join(["%s"] * len(chunk)),
+                    chunk,
+                )
 
-        def log(message, level=LOG_INFO, name=DEFAULT_LOG_NAME, log_type="server"):
-            if self.env.context.get("new_cursor_logs") is False:
-                return _log(self.env.cr, message, level, name, log_type)
+        def _row(message, level, name, log_type):
+            return (
+                fields.Datetime.now(),
+                self.env.uid,
+                log_type,
+                self._cr.dbname,
+                name,
+                level,
+                message,
+                "sync.job",
+                job.id,
+                function,
+                job.id,
+            )
 
+        def _count(rows):
+            # level is the 6th value of the row
+            state["levels"].extend(row[5] for row in rows)
+            if state["closed"]:
+                # e.g. logs of the webhook response written after the run
+                save_counts()
+
+        def save_counts():
+            """Update counters of the job in its transaction"""
+            levels = state["levels"]
+            state["levels"] = []
+            job.sudo()._add_log_counts(levels)
+
+        def flush():
+            if not buffer:
+                return
+            rows = buffer[:]
+            del buffer[:]
+            # log records survive rollback of the job transaction
             with self.env.registry.cursor() as cr:
-                return _log(cr, message, level, name, log_type)
+                _log(cr, rows)
+            _count(rows)
+            state["flushed_at"] = time_module.time()
+
+        def close():
+            """Flush buffer, update counters and write and count next logs
+            immediately"""
+            flush()
+            save_counts()
+            state["buffered"] = False
+            state["closed"] = True
+
+        def is_enabled(level):
+            # unknown levels are always saved
+            return levels.get(level, len(levels)) >= min_level_index
 
+        def log(message, level=LOG_INFO, name=DEFAULT_LOG_NAME, log_type="server"):
+            if not is_enabled(level):
+                return
+            row = _row(message, level, name, log_type)
+            if self.env.context.get("new_cursor_logs") is False:
+                _log(self.env.cr, [row])
+                return _count([row])
+
+            if not state["buffered"]:
+                with self.env.registry.cursor() as cr:
+                    _log(cr, [row])
+                return _count([row])
+
+            buffer.append(row)
+            if (
+                len(buffer) >= buffer_size
+                or level in (LOG_ERROR, LOG_CRITICAL)
+                or time_module.time() - state["flushed_at"] >= buffer_interval
+            ):
+                flush()
+
+        log.is_enabled = is_enabled
+        log.flush = flush
+        log.close = close
         return log
 
     def _get_eval_context(self, job, log):
         """Prepare Task Evaluation Context"""
         self.ensure_one()
         log("Let's prepare Evaluation Context", LOG_DEBUG)
+        snapshot = None
+        if self.eval_context_cache:
+            snapshot = self._get_eval_context_snapshot()
+        if snapshot:
+            log("Reuse Evaluation Context snapshot", LOG_DEBUG)
+            self._bind_eval_context_snapshot(snapshot, job, log)
+        else:
+            snapshot = self._build_eval_context_snapshot(job, log)
+            if self.eval_context_cache:
+                self._set_eval_context_snapshot(snapshot)
+        # id of the job that owns the snapshot, see _release_eval_context
+        snapshot["in_use"] = job.id
+        task_eval_context = dict(snapshot["lib_eval_context"], LIB=snapshot["LIB"])
+        log("Evaluation Context is ready!", LOG_DEBUG)
+        return task_eval_context
+
+    def _get_eval_context_snapshot_key(self):
+        """Version of the data the evaluation context is built from"""
+        self.ensure_one()
+        project = self.sudo()
+        # values of LIB and CORE may depend on the user and translations
+        key = [
+            self.env.cr.dbname,
+            self.env.uid,
+            self.env.lang,
+            project.id,
+            project.write_date,
+        ]
+        for records in (
+            project.param_ids,
+            project.text_param_ids,
+            project.secret_ids,
+            project.data_ids,
+            project.task_ids.mapped("webhook_ids"),
+        ):
+            key.append(tuple(records.ids))
+            key.append(max(records.mapped("write_date"), default=None))
+        return tuple(key)
+
+    def _get_eval_context_snapshot(self):
+        snapshots = getattr(EVAL_CONTEXT_SNAPSHOTS, "snapshots", {})
+        key, snapshot = snapshots.get((self.env.cr.dbname, self.id), (None, None))
+        if not snapshot or snapshot["in_use"]:
+            # Nested job in the same thread cannot share the snapshot
+            return None
+        if key != self._get_eval_context_snapshot_key():
+            return None
+        return snapshot
+
+    def _set_eval_context_snapshot(self, snapshot):
+        if not hasattr(EVAL_CONTEXT_SNAPSHOTS, "snapshots"):
+            EVAL_CONTEXT_SNAPSHOTS.snapshots = {}
+        _key, current = EVAL_CONTEXT_SNAPSHOTS.snapshots.get(
+            (self.env.cr.dbname, self.id), (None, None)
+        )
+        if current and current["in_use"]:
+            # Keep the snapshot of the outer job
+            return
+        EVAL_CONTEXT_SNAPSHOTS.snapshots[(self.env.cr.dbname, self.id)] = (
+            self._get_eval_context_snapshot_key(),
+            snapshot,
+        )
+
+    def _drop_eval_context_snapshot(self):
+        snapshots = getattr(EVAL_CONTEXT_SNAPSHOTS, "snapshots", {})
+        for project in self:
+            snapshots.pop((self.env.cr.dbname, project.id), None)
+
+    def _release_eval_context(self, job):
+        """Release the snapshot acquired by the job in _get_eval_context"""
+        snapshots = getattr(EVAL_CONTEXT_SNAPSHOTS, "snapshots", {})
+        for project in self:
+            _key, snapshot = snapshots.get(
+                (self.env.cr.dbname, project.id), (None, None)
+            )
+            if snapshot and snapshot["in_use"] == job.id:
+                snapshot["in_use"] = False
+
+    def _get_eval_context_job_items(self, job, log):
+        """Parts of MAGIC that depend on the job"""
 
         def add_job(function, **options):
             if callable(function):
@@ -234,9 +490,9 @@ class SyncProject(models.Model):
                 sub_job = self.env["sync.job"].create(
                     {"parent_job_id": job.id, "function": function}
                 )
-                queue_job = job.task_id.with_delay(**options).run(
-                    sub_job, function, args, kwargs
-                )
+                queue_job = job.task_id.with_delay(
+                    **dict(job.task_id._get_job_options(), **options)
+                ).run(sub_job, function, args, kwargs)
                 sub_job.queue_job_id = queue_job.db_record()
                 log(
                     "add_job: %s(*%s, **%s). See %s"
@@ -246,9 +502,83 @@ class SyncProject(models.Model):
 
             return f
 
+        def add_jobs(function, list_of_args, chunk_size=None, **options):
+            if callable(function):
+                function = function.__name__
+
+            items = [list(args) for args in list_of_args]
+            if not items:
+                return
+            chunks = list(split_every(chunk_size or 1, items, list))
+            sub_jobs = self.env["sync.job"].create(
+                [{"parent_job_id": job.id, "function": function} for c in chunks]
+            )
+            job.task_id._delay_run_many(sub_jobs, function, chunks, **options)
+            log(
+                "add_jobs: %s for %s items in %s jobs. See %s"
+                % (function, len(items), len(sub_jobs), job),
+                level=LOG_INFO,
+            )
+
         def log_transmission(recipient_str, data_str):
             log(data_str, name=recipient_str, log_type="data_out")
 
+        context = dict(
+            self.env.context,
+            log_function=log,
+            sync_project_id=self.id,
+            sync_link_cache={},
+        )
+        env = self.env(context=context)
+        link_functions = env["sync.link"]._get_eval_context()
+        return dict(
+            **link_functions,
+            **self._get_sync_functions(log, link_functions),
+            **{
+                "env": env,
+                "log": log,
+                "log_transmission": log_transmission,
+                "user": self.env.user,
+                "trigger": job.trigger_name,
+                "add_job": add_job,
+                "add_jobs": add_jobs,
+            },
+        )
+
+    def _get_update_param_function(self, PARAMS):
+        def _update_param(key, value):
+            PARAMS[key] = value
+            # The new value is not committed yet, so the cached snapshot
+            # must not be reused by other jobs
+            self._drop_eval_context_snapshot()
+            for p in self.param_ids:
+                if p.key == key:
+                    p.value = value
+                    return
+            self.env["sync.project.param"].create(
+                {
+                    "project_id": self.id,
+                    "key": key,
+                    "value": value,
+                }
+            )
+
+        return _update_param
+
+    def _bind_eval_context_snapshot(self, snapshot, job, log):
+        """Replace per-job values in a cached snapshot.
+
+        Values are updated in place, because CORE and LIB functions refer to
+        the same MAGIC, PARAMS and DATA objects.
+        """
+        snapshot["MAGIC"].update(self._get_eval_context_job_items(job, log))
+        PARAMS = snapshot["PARAMS"]
+        PARAMS["_update_param"] = self._get_update_param_function(PARAMS)
+        DATA = snapshot["DATA"]
+        for d in self.data_ids:
+            DATA[d.name] = d
+
+    def _build_eval_context_snapshot(self, job, log):
         def safe_getattr(o, k, d=None):
             if k.startswith("_"):
                 raise ValidationError(_("You cannot use %s with getattr") % k)
@@ -313,24 +643,14 @@ class SyncProject(models.Model):
 
             return csv_content
 
-        context = dict(self.env.context, log_function=log, sync_project_id=self.id)
-        env = self.env(context=context)
-        link_functions = env["sync.link"]._get_eval_context()
         MAGIC = AttrDict(
-            **link_functions,
-            **self._get_sync_functions(log, link_functions),
+            **self._get_eval_context_job_items(job, log),
             **{
-                "env": env,
-                "log": log,
-                "log_transmission": log_transmission,
                 "LOG_DEBUG": LOG_DEBUG,
                 "LOG_INFO": LOG_INFO,
                 "LOG_WARNING": LOG_WARNING,
                 "LOG_ERROR": LOG_ERROR,
                 "LOG_CRITICAL": LOG_CRITICAL,
-                "user": self.env.user,
-                "trigger": job.trigger_name,
-                "add_job": add_job,
                 "json": json,
                 "UserError": UserError,
                 "ValidationError": ValidationError,
@@ -361,21 +681,8 @@ class SyncProject(models.Model):
         for p in self.secret_ids:
             SECRETS[p.key] = p.value
 
-        def _update_param(key, value):
-            PARAMS[key] = value
-            for p in self.param_ids:
-                if p.key == key:
-                    p.value = value
-                    return
-            self.env["sync.project.param"].create(
-                {
-                    "project_id": self.id,
-                    "key": key,
-                    "value": value,
-                }
-            )
-
-        PARAMS = AttrDict(_update_param)
+        PARAMS = AttrDict()
+        PARAMS["_update_param"] = self._get_update_param_function(PARAMS)
         for p in self.param_ids:
             PARAMS[p.key] = p.value
 
@@ -403,7 +710,7 @@ class SyncProject(models.Model):
             "PARAMS": PARAMS,
             "DATA": DATA,
         }
-        CORE = eval_export(safe_eval__MAGIC, self.core_code, core_eval_context)
+        CORE = eval_export(safe_eval__MAGIC__CACHED, self.core_code, core_eval_context)
 
         lib_eval_context = {
             "MAGIC": MAGIC,
@@ -412,19 +719,62 @@ class SyncProject(models.Model):
             "CORE": CORE,
             "WEBHOOKS": WEBHOOKS,
         }
-        LIB = eval_export(safe_eval, self.common_code, lib_eval_context)
+        LIB = eval_export(safe_eval__CACHED, self.common_code, lib_eval_context)
 
-        task_eval_context = dict(lib_eval_context, LIB=LIB)
-        log("Evaluation Context is ready!", LOG_DEBUG)
-        return task_eval_context
+        return {
+            "MAGIC": MAGIC,
+            "PARAMS": PARAMS,
+            "DATA": DATA,
+            "LIB": LIB,
+            "lib_eval_context": lib_eval_context,
+            "in_use": False,
+        }
 
     def _get_sync_functions(self, log, link_functions):
-        def _sync(src_list, src2dst, link_src_dst, create=None, update=None):
+        def _log_skipped(src_data, dst_ref):
+            if not log.is_enabled(LOG_DEBUG):
+                return
+            if dst_ref:
+                log("Destination record already exists: %s" % dst_ref, LOG_DEBUG)
+            else:
+                log("Destination record not found for %s" % src_data, LOG_DEBUG)
+
+        def _sync(
+            src_list,
+            src2dst,
+            link_src_dst,
+            create=None,
+            update=None,
+            chunk_size=None,
+            src2dst_many=None,
+            link_many=None,
+            create_many=None,
+            update_many=None,
+            src2key=None,
+        ):
             # * src_list: iterator of src_data
             # * src2dst: src_data -> dst_ref
             # * link_src_dst: links pair (src_data, dst_ref)
             # * create(src_data) -> dst_ref
             # * update(dst_ref, src_data)
+            # Chunked mode (chunk_size is set):
+            # * src2dst_many: [src_data] -> [dst_ref]
+            # * link_many: links pairs [(src_data, dst_ref)]
+            # * create_many: [src_data] -> [dst_ref]
+            # * update_many: [(dst_ref, src_data)]
+            # * src2key: src_data -> hashable reference of the source
+            if chunk_size:
+                return _sync_chunked(
+                    src_list,
+                    src2key,
+                    src2dst_many or (lambda chunk: [src2dst(s) for s in chunk]),
+                    link_many or (lambda pairs: [link_src_dst(s, d) for s, d in pairs]),
+                    chunk_size,
+                    create=create_many
+                    or (create and (lambda chunk: [create(s) for s in chunk])),
+                    update=update_many
+                    or (update and (lambda pairs: [update(d, s) for d, s in pairs])),
+                )
             for src_data in src_list:
                 dst_ref = src2dst(src_data)
                 if dst_ref and update:
@@ -432,21 +782,91 @@ class SyncProject(models.Model):
                 elif not dst_ref and create:
                     dst_ref = create(src_data)
                     link_src_dst(src_data, dst_ref)
-                elif dst_ref:
-                    log("Destination record already exists: %s" % dst_ref, LOG_DEBUG)
-                elif not dst_ref:
-                    log("Destination record not found for %s" % src_data, LOG_DEBUG)
+                else:
+                    _log_skipped(src_data, dst_ref)
+
+        def _dedup_chunk(chunk, src2key):
+            # The same source may appear twice in a chunk. Keep the last one,
+            # as in non-chunked mode it's the last update that wins
+            last_index = {src2key(src_data): i for i, src_data in enumerate(chunk)}
+            if len(last_index) == len(chunk):
+                return chunk
+            return [chunk[i] for i in sorted(last_index.values())]
+
+        def _sync_chunked(
+            src_list,
+            src2key,
+            src2dst_many,
+            link_many,
+            chunk_size,
+            create=None,
+            update=None,
+        ):
+            for chunk in split_every(chunk_size, src_list, list):
+                if src2key:
+                    chunk = _dedup_chunk(chunk, src2key)
+                to_update = []
+                to_create = []
+                for src_data, dst_ref in zip(chunk, src2dst_many(chunk)):
+                    if dst_ref and update:
+                        to_update.append((dst_ref, src_data))
+                    elif not dst_ref and create:
+                        to_create.append(src_data)
+                    else:
+                        _log_skipped(src_data, dst_ref)
+                if to_update:
+                    update(to_update)
+                if to_create:
+                    dst_refs = create(to_create)
+                    link_many(list(zip(to_create, dst_refs)))
+                if log.is_enabled(LOG_DEBUG):
+                    log(
+                        "Chunk processed: %s updated, %s created, %s skipped"
+                        % (
+                            len(to_update),
+                            len(to_create),
+                            len(chunk) - len(to_update) - len(to_create),
+                        ),
+                        LOG_DEBUG,
+                    )
+
+        def _set_odoo_links_many(relation, pairs):
+            # pairs: [(odoo_record, external_ref)]
+            by_model = defaultdict(list)
+            for odoo_record, ref in pairs:
+                by_model[odoo_record._name].append((odoo_record, ref))
+            for model_pairs in by_model.values():
+                model_pairs[0][0].browse().set_links_many(relation, model_pairs)
 
-        def sync_odoo2x(src_list, sync_info, create=False, update=False):
+        def sync_odoo2x(
+            src_list, sync_info, create=False, update=False, chunk_size=None
+        ):
             # sync_info["relation"]
             # sync_info["x"]["update"]: (external_ref, odoo_record)
             # sync_info["x"]["create"]: odoo_record -> external_ref
+            # Optional, for chunked mode:
+            # sync_info["x"]["update_many"]: [(external_ref, odoo_record)]
+            # sync_info["x"]["create_many"]: [odoo_record] -> [external_ref]
             relation = sync_info["relation"]
 
             def _odoo2external(odoo_record):
                 link = odoo_record.search_links(relation)
                 return link.external
 
+            def _odoo2external_many(odoo_records):
+                by_model = defaultdict(list)
+                for r in odoo_records:
+                    by_model[r._name].append(r.id)
+                links = {}
+                for model, ids in by_model.items():
+                    links[model] = link_functions["get_links_many"](
+                        relation, "odoo", ids, model=model
+                    )
+                return [
+                    links[r._name][r.id].external if r.id in links[r._name] else None
+                    for r in odoo_records
+                ]
+
             def _add_link(odoo_record, external):
                 odoo_record.set_link(relation, external)
 
@@ -456,13 +876,24 @@ class SyncProject(models.Model):
                 _add_link,
                 create and sync_info["x"]["create"],
                 update and sync_info["x"]["update"],
+                chunk_size=chunk_size,
+                src2dst_many=_odoo2external_many,
+                link_many=lambda pairs: _set_odoo_links_many(relation, pairs),
+                create_many=create and sync_info["x"].get("create_many"),
+                update_many=update and sync_info["x"].get("update_many"),
+                src2key=lambda odoo_record: (odoo_record._name, odoo_record.id),
             )
 
-        def sync_x2odoo(src_list, sync_info, create=False, update=False):
+        def sync_x2odoo(
+            src_list, sync_info, create=False, update=False, chunk_size=None
+        ):
             # sync_info["relation"]
             # sync_info["x"]["get_ref"]
             # sync_info["odoo"]["update"]: (odoo_record, x)
             # sync_info["odoo"]["create"]: x -> odoo_record
+            # Optional, for chunked mode:
+            # sync_info["odoo"]["update_many"]: [(odoo_record, x)]
+            # sync_info["odoo"]["create_many"]: [x] -> [odoo_record]
             relation = sync_info["relation"]
             x2ref = sync_info["x"]["get_ref"]
 
@@ -471,27 +902,59 @@ class SyncProject(models.Model):
                 link = link_functions["get_link"](relation, ref)
                 return link.odoo
 
+            def _x2odoo_many(xs):
+                refs = [x2ref(x) for x in xs]
+                links = link_functions["get_links_many"](relation, "external", refs)
+                if any(len(link) > 1 for link in links.values()):
+                    # same check as in get_link
+                    raise ValidationError(
+                        _(
+                            "get_link found multiple links. Use search_links for many2many relations"
+                        )
+                    )
+                return [links[ref].odoo if ref in links else None for ref in refs]
+
             def _add_link(x, odoo_record):
                 ref = x2ref(x)
                 link = odoo_record.set_link(relation, ref)
                 return link
 
+            def _add_links_many(pairs):
+                _set_odoo_links_many(
+                    relation, [(odoo_record, x2ref(x)) for x, odoo_record in pairs]
+                )
+
             return _sync(
                 src_list,
                 _x2odoo,
                 _add_link,
                 create and sync_info["odoo"]["create"],
                 update and sync_info["odoo"]["update"],
+                chunk_size=chunk_size,
+                src2dst_many=_x2odoo_many,
+                link_many=_add_links_many,
+                create_many=create and sync_info["odoo"].get("create_many"),
+                update_many=update and sync_info["odoo"].get("update_many"),
+                src2key=x2ref,
             )
 
         def sync_external(
-            src_list, relation, src_info, dst_info, create=False, update=False
+            src_list,
+            relation,
+            src_info,
+            dst_info,
+            create=False,
+            update=False,
+            chunk_size=None,
         ):
             # src_info["get_ref"]
             # src_info["system"]: e.g. "github"
             # src_info["update"]: (dst_ref, src_data)
             # src_info["create"]: src_data -> dst_ref
             # dst_info["system"]: e.g. "trello"
+            # Optional, for chunked mode:
+            # src_info["update_many"]: [(dst_ref, src_data)]
+            # src_info["create_many"]: [src_data] -> [dst_ref]
             def src2dst(src_data):
                 src_ref = src_info["get_ref"](src_data)
                 refs = {src_info["system"]: src_ref, dst_info["system"]: None}
@@ -500,17 +963,50 @@ class SyncProject(models.Model):
                 if len(res) == 1:
                     return res[0]
 
+            def src2dst_many(chunk):
+                src_refs = [src_info["get_ref"](src_data) for src_data in chunk]
+                links = link_functions["get_links_many"](
+                    relation, src_info["system"], src_refs, dst_info["system"]
+                )
+                res = []
+                for src_ref in src_refs:
+                    dst_refs = (
+                        links[src_ref].get(dst_info["system"])
+                        if src_ref in links
+                        else []
+                    )
+                    res.append(dst_refs[0] if len(dst_refs) == 1 else None)
+                return res
+
             def link_src_dst(src_data, dst_ref):
                 src_ref = src_info["get_ref"](src_data)
                 refs = {src_info["system"]: src_ref, dst_info["system"]: dst_ref}
                 return link_functions["set_link"](relation, refs)
 
+            def link_many(pairs):
+                return link_functions["set_links_many"](
+                    relation,
+                    [
+                        {
+                            src_info["system"]: src_info["get_ref"](src_data),
+                            dst_info["system"]: dst_ref,
+                        }
+                        for src_data, dst_ref in pairs
+                    ],
+                )
+
             return _sync(
                 src_list,
                 src2dst,
                 link_src_dst,
                 create and src_info["odoo"]["create_odoo"],
                 update and src_info["odoo"]["update_odoo"],
+                chunk_size=chunk_size,
+                src2dst_many=src2dst_many,
+                link_many=link_many,
+                create_many=create and src_info.get("create_many"),
+                update_many=update and src_info.get("update_many"),
+                src2key=src_info["get_ref"],
             )
 
         return {
@@ -521,13 +1017,125 @@ class SyncProject(models.Model):
 
     def magic_upgrade(self):
         self.ensure_one()
-        if not self.source_url:
-            raise UserError(_("Please provide url to the gist page"))
+        if not (self.source_url or self.source_file):
+            raise UserError(
+                _("Please provide url to the gist page or upload an archive")
+            )
 
-        gist_content = fetch_gist_data(self.source_url)
+        gist_content = self._fetch_source()
         gist_files = {}
+        file_hashes = {}
         for file_name, file_info in gist_content["files"].items():
             gist_files[file_name] = file_info["content"]
+            # Content of big files is truncated, but their raw_url contains
+            # the gist revision
+            if "raw" in file_info:
+                content = file_info["raw"]
+            elif file_info.get("truncated"):
+                content = file_info["raw_url"].encode()
+            else:
+                content = file_info["content"].encode()
+            file_hashes[file_name] = sha256(content).hexdigest()
+
+        # Compare files with the previous upgrade. Records of unchanged files
+        # are not updated at all.
+        old_hashes = json.loads(self.source_hashes or "{}")
+        new_hashes = {}
+        stats = dict.fromkeys(("created", "updated", "unchanged", "deleted"), 0)
+
+        def is_changed(key, file_names, exists=True):
+            new_hashes[key] = sha256(
+                "".join(file_hashes.get(f, "") for f in file_names).encode()
+            ).hexdigest()
+            if not exists or key not in old_hashes:
+                stats["created"] += 1
+                return True
+            if old_hashes[key] != new_hashes[key]:
+                stats["updated"] += 1
+                return True
+            stats["unchanged"] += 1
+            return False
+
+        # Download data files before making any changes in database
+        data_files = {
+            file_info["filename"]: file_info
+            for file_info in gist_content["files"].values()
+            # e.g. "data.emoji.csv"
+            if file_info["filename"].startswith("data.")
+            and file_info["filename"] != "data.markdown"
+            and is_changed(
+                file_info["filename"],
+                [file_info["filename"]],
+                self.env["sync.data"]._get_by_xmlid(
+                    file_info["filename"], namespace=self.id
+                ),
+            )
+        }
+        raw_files = fetch_raw_files(
+            [
+                file_info["raw_url"]
+                for file_info in data_files.values()
+                if "raw" not in file_info
+            ]
+        )
+
+        # Parse and validate tasks before making any changes in database
+        tasks = []
+        for file_name in gist_files:
+            # e.g. "task.setup.py"
+            if not (file_name.startswith("task.") and file_name.endswith(".py")):
+                continue
+
+            # e.g. "setup"
+            task_technical_name = file_name[len("task.") : -len(".py")]
+            # e.g. "task.setup.markdown"
+            description_file_name = file_name[: -len(".py")] + ".markdown"
+            if not is_changed(
+                file_name,
+                [file_name, description_file_name],
+                self.env["sync.task"]._get_by_xmlid(
+                    task_technical_name, namespace=self.id
+                ),
+            ):
+                continue
+
+            # Process file content
+            file_content = gist_files[file_name]
+            meta = extract_yaml_from_python(file_content)
+            task_name = meta.get("TITLE", f"<No TITLE found at the {file_name}>")
+
+            # Update code to bypass security checks
+            file_content = convert_python_front_matter_to_comment(file_content)
+
+            # Check if code is valid
+            syntax_errors = test_python_expr(file_content, mode="exec")
+            if syntax_errors:
+                raise ValueError(
+                    f"Invalid python code at file {file_name}:\n\n{syntax_errors}"
+                )
+
+            # Check if python code has method `handle_button`
+            has_handle_button = has_function_defined(file_content, "handle_button")
+
+            task_vals = {
+                "name": task_name,
+                "code": file_content,
+                "magic_button": meta.get("MAGIC_BUTTON", "Magic ✨ Button")
+                if has_handle_button
+                else None,
+                "project_id": self.id,
+                # task may be archived when its file was removed before
+                "active": True,
+            }
+
+            # Parse docs
+            sync_order_description = gist_files.get(description_file_name)
+            if sync_order_description:
+                task_vals["sync_order_description"] = compile_markdown_to_html(
+                    sync_order_description
+                )
+
+            tasks.append((task_technical_name, meta, task_vals))
 
         vals = {}
 
@@ -544,6 +1152,8 @@ class SyncProject(models.Model):
             ("task_description", "tasks.markdown"),
             ("data_description", "datas.markdown"),
         ):
+            if not is_changed(file_name, [file_name]):
+                continue
             vals[field_name] = (
                 compile_markdown_to_html(gist_files.get(file_name))
                 if gist_files.get(file_name)
@@ -563,121 +1173,86 @@ class SyncProject(models.Model):
             file_content = gist_files.get(file_name)
             if not file_content:
                 continue
-            vals[field_name] = compile_markdown_to_html(file_content)
             meta = extract_yaml_from_markdown(file_content)
+            if not is_changed(
+                file_name,
+                [file_name],
+                all(
+                    self.env[model]._get_by_xmlid(f"PARAM_{key}", namespace=self.id)
+                    for key in meta
+                ),
+            ):
+                continue
+            vals[field_name] = compile_markdown_to_html(file_content)
 
-            for key, initial_value in meta.items():
-                param_vals = {
-                    "key": key,
-                    "initial_value": initial_value,
-                    "project_id": self.id,
-                }
-                self.env[model]._create_or_update_by_xmlid(
-                    param_vals, f"PARAM_{key}", namespace=self.id
-                )
+            self.env[model]._create_or_update_many_by_xmlid(
+                {
+                    f"PARAM_{key}": {
+                        "key": key,
+                        "initial_value": initial_value,
+                        "project_id": self.id,
+                    }
+                    for key, initial_value in meta.items()
+                },
+                namespace=self.id,
+            )
 
         # [CORE] and [LIB]
         for field_name, file_name in (
             ("core_code", "core.py"),
             ("common_code", "library.py"),
         ):
-            if gist_files.get(file_name):
+            if gist_files.get(file_name) and is_changed(file_name, [file_name]):
                 vals[field_name] = gist_files[file_name]
 
         # [DATA]
-        http = urllib3.PoolManager()
-        for file_info in gist_content["files"].values():
-            # e.g. "data.emoji.csv"
-            file_name = file_info["filename"]
-            if not (file_name.startswith("data.") and file_name != "data.markdown"):
-                continue
-            raw_url = file_info["raw_url"]
-            response = http.request("GET", raw_url)
-            if response.status == 200:
-                file_content = response.data
-                file_content = base64.b64encode(file_content)
-            else:
-                raise Exception(
-                    f"Failed to fetch raw content from {raw_url}. Status code: {response.status}"
-                )
+        data_vals_by_code = {}
+        for file_name, file_info in data_files.items():
+            file_content = base64.b64encode(
+                file_info["raw"]
+                if "raw" in file_info
+                else raw_files[file_info["raw_url"]]
+            )
 
             technical_name = file_name
             technical_name = technical_name[len("data.") :]
             technical_name = os.path.splitext(technical_name)[0]
             technical_name = technical_name.replace(".", "_")
 
-            data_vals = {
+            data_vals_by_code[file_name] = {
                 "name": technical_name,
                 "project_id": self.id,
                 "file_name": file_name,
                 "file_content": file_content,
+                "active": True,
             }
-            self.env["sync.data"]._create_or_update_by_xmlid(
-                data_vals, file_name, namespace=self.id
-            )
+        self.env["sync.data"]._create_or_update_many_by_xmlid(
+            data_vals_by_code, namespace=self.id
+        )
 
         # Tasks 🦋
-        for file_name in gist_files:
-            # e.g. "task.setup.py"
-            if not (file_name.startswith("task.") and file_name.endswith(".py")):
-                continue
-
-            # e.g. "setup"
-            task_technical_name = file_name[len("task.") : -len(".py")]
-
-            # Process file content
-            file_content = gist_files[file_name]
-            meta = extract_yaml_from_python(file_content)
-            task_name = meta.get("TITLE", f"<No TITLE found at the {file_name}>")
-
-            # Update code to bypass security checks
-            file_content = convert_python_front_matter_to_comment(file_content)
-
-            # Check if code is valid
-            syntax_errors = test_python_expr(file_content, mode="exec")
-            if syntax_errors:
-                raise ValueError(
-                    f"Invalid python code at file {file_name}:\n\n{syntax_errors}"
-                )
-
-            # Check if python code has method `handle_button`
-            has_handle_button = has_function_defined(file_content, "handle_button")
-
-            task_vals = {
-                "name": task_name,
-                "code": file_content,
-                "magic_button": meta.get("MAGIC_BUTTON", "Magic ✨ Button")
-                if has_handle_button
-                else None,
-                "project_id": self.id,
-            }
+        task_vals_by_code = {}
+        for task_technical_name, meta, task_vals in tasks:
             # Sync Order Model
             if meta.get("SYNC_ORDER_MODEL"):
                 model = self._get_model(meta.get("SYNC_ORDER_MODEL"))
                 task_vals["sync_order_model_id"] = model.id
+            task_vals_by_code[task_technical_name] = task_vals
 
-            # Parse docs
-            sync_order_description = gist_files.get(
-                file_name[: -len(".py")] + ".markdown"
-            )
-            if sync_order_description:
-                task_vals["sync_order_description"] = compile_markdown_to_html(
-                    sync_order_description
-                )
-
-            task = self.env["sync.task"]._create_or_update_by_xmlid(
-                task_vals, task_technical_name, namespace=self.id
-            )
+        task_records = self.env["sync.task"]._create_or_update_many_by_xmlid(
+            task_vals_by_code, namespace=self.id
+        )
+        for task_technical_name, meta, _task_vals in tasks:
+            task = task_records[task_technical_name]
+            # model -> trigger name -> vals
+            triggers = defaultdict(dict)
 
             def create_trigger(model, data):
-                vals = dict(
+                triggers[model][data["name"]] = dict(
                     {key: value for key, value in data.items() if value is not None},
                     sync_task_id=task.id,
                     trigger_name=data["name"],
                 )
-                return self.env[model]._create_or_update_by_xmlid(
-                    vals, data["name"], namespace=f"p{self.id}t{task.id}"
-                )
 
             # Create/Update triggers
             for data in meta.get("CRON", []):
@@ -705,8 +1280,67 @@ class SyncProject(models.Model):
                     "sync.trigger.automation", dict(data, model_id=model.id, model=None)
                 )
 
+            for model, vals_by_code in triggers.items():
+                self.env[model]._create_or_update_many_by_xmlid(
+                    vals_by_code, namespace=f"p{self.id}t{task.id}"
+                )
+
+        # Removed files: archive tasks and data files. They are activated
+        # again if the files are added back
+        for file_name in set(old_hashes) - set(new_hashes):
+            if file_name.startswith("task.") and file_name.endswith(".py"):
+                record = self.env["sync.task"]._get_by_xmlid(
+                    file_name[len("task.") : -len(".py")], namespace=self.id
+                )
+            elif file_name.startswith("data."):
+                record = self.env["sync.data"]._get_by_xmlid(
+                    file_name, namespace=self.id
+                )
+            else:
+                continue
+            if record.active:
+                record.active = False
+                stats["deleted"] += 1
+
+        vals["source_hashes"] = json.dumps(new_hashes)
+        vals["source_upgrade_summary"] = (
+            _(
+                "Created: %(created)s, Updated: %(updated)s, "
+                "Unchanged: %(unchanged)s, Deleted: %(deleted)s"
+            )
+            % stats
+        )
         self.update(vals)
 
+    def _fetch_source(self):
+        """Read project files from the archive, local path or gist page"""
+        if self.source_file:
+            return read_source_files(archive=base64.b64decode(self.source_file))
+        if self.source_url.startswith(("http://", "https://")):
+            return fetch_gist_data(self.source_url)
+
+        path = self.source_url
+        if path.startswith("file://"):
+            path = path[len("file://") :]
+        path = os.path.realpath(path)
+        allowed_paths = [
+            os.path.realpath(p.strip())
+            for p in (config.get("sync_source_path") or "").split(",")
+            if p.strip()
+        ]
+        if not any(
+            os.path.commonpath([allowed, path]) == allowed for allowed in allowed_paths
+        ):
+            raise UserError(
+                _(
+                    "Reading %s is not allowed. "
+                    "Add its directory to the option sync_source_path "
+                    "of the server configuration."
+                )
+                % self.source_url
+            )
+        return read_source_files(path=path)
+
     def _get_model(self, model_name):
         model = self.env["ir.model"]._get(model_name)
         if not model:
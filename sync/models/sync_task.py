@@ -3,17 +3,27 @@
 # License MIT (https://opensource.org/licenses/MIT).
 
 import logging
+import random
 import time
 import traceback
+from datetime import datetime
 from io import StringIO
 
 from odoo import api, fields, models
 from odoo.exceptions import ValidationError
-from odoo.tools.safe_eval import safe_eval, test_python_expr
+from odoo.tools.safe_eval import test_python_expr
 
-from .ir_logging import LOG_CRITICAL, LOG_DEBUG
+from odoo.addons.queue_job.exception import RetryableJobError
+from odoo.addons.queue_job.job import STARTED, Job
+
+from ..lib.tools.safe_eval import safe_eval__CACHED
+from .ir_logging import LOG_CRITICAL, LOG_DEBUG, LOG_LEVEL_SELECTION
 
 _logger = logging.getLogger(__name__)
+# Seconds to postpone a job, when max number of parallel jobs is reached.
+# A random delay up to the same value is added, so postponed jobs don't
+# come back all at once
+MAX_PARALLEL_RETRY_DELAY = 10
 
 
 class SyncTask(models.Model):
@@ -29,6 +39,26 @@ class SyncTask(models.Model):
     sync_order_model_id = fields.Many2one("ir.model")
     sync_order_description = fields.Html(readonly=True)
     magic_button = fields.Char()
+    log_level = fields.Selection(
+        LOG_LEVEL_SELECTION,
+        string="Minimal Log Level",
+        help="Leave empty to use the value from the Project",
+    )
+    job_channel = fields.Char(
+        "Queue Channel", help="Leave empty to use the value from the Project"
+    )
+    job_priority = fields.Integer(
+        "Job Priority",
+        help="Leave zero to use the value from the Project. "
+        "As zero means no value, the highest priority 0 can be set on the Project only",
+    )
+    job_max_parallel = fields.Integer(
+        "Max Parallel Jobs",
+        help="Limit for the jobs of this task. Limit of the Project is applied too.",
+    )
+    job_eta_spread = fields.Integer(
+        "Spread Jobs", help="Leave zero to use the value from the Project"
+    )
     button_ids = fields.One2many(
         "sync.trigger.button", "sync_task_id", string="Manual Triggers", copy=True
     )
@@ -61,17 +91,12 @@ class SyncTask(models.Model):
     job_ids = fields.One2many("sync.job", "task_id")
     job_count = fields.Integer(compute="_compute_job_count")
     log_ids = fields.One2many("ir.logging", "sync_task_id")
-    log_count = fields.Integer(compute="_compute_log_count")
+    log_count = fields.Integer(compute="_compute_job_count")
 
-    @api.depends("job_ids")
     def _compute_job_count(self):
+        counts = self.env["sync.job"]._read_counts("task_id", self.ids)
         for r in self:
-            r.job_count = len(r.job_ids)
-
-    @api.depends("log_ids")
-    def _compute_log_count(self):
-        for r in self:
-            r.log_count = len(r.log_ids)
+            r.job_count, r.log_count = counts.get(r.id, (0, 0))
 
     @api.constrains("code")
     def _check_python_code(self):
@@ -142,7 +167,13 @@ class SyncTask(models.Model):
         }
 
     def start(
-        self, trigger, args=None, with_delay=False, force=False, raise_on_error=True
+        self,
+        trigger,
+        args=None,
+        with_delay=False,
+        force=False,
+        raise_on_error=True,
+        delay_options=None,
     ):
         self.ensure_one()
         if not force and not (self.active and self.project_id.active):
@@ -152,7 +183,11 @@ class SyncTask(models.Model):
             return None
 
         job = self.env["sync.job"].create_trigger_job(trigger)
-        run = self.with_delay().run if with_delay else self.run
+        if with_delay:
+            options = dict(self._get_job_options(), **(delay_options or {}))
+            run = self.with_delay(**options).run
+        else:
+            run = self.run
         if not with_delay and self.env.context.get("new_cursor_logs") is not False:
             # log records are created via new cursor and they use job.id value for sync_job_id field
             self.env.cr.commit()  # pylint: disable=invalid-commit
@@ -167,32 +202,139 @@ class SyncTask(models.Model):
             return job, queue_job_or_result
 
     def run(self, job, function, args=None, kwargs=None, raise_on_error=True):
-        log = self.project_id._get_log_function(job, function)
+        res = self._run(job, function, [(args, kwargs)], raise_on_error)
+        if res:
+            results, log = res
+            return results[0], log
+
+    def run_many(self, job, function, args_list, raise_on_error=True):
+        """Call the function for every item of args_list within a single job"""
+        self._run(job, function, [(args, None) for args in args_list], raise_on_error)
+
+    def _get_job_options(self):
+        """Options of ``with_delay`` for the jobs of the task"""
+        self.ensure_one()
+        project = self.project_id
+        options = {"priority": self.job_priority or project.job_priority}
+        channel = self.job_channel or project.job_channel
+        if channel:
+            options["channel"] = channel
+        eta_spread = self.job_eta_spread or project.job_eta_spread
+        if eta_spread:
+            options["eta"] = random.randint(0, eta_spread)
+        return options
+
+    def _check_max_parallel(self, job):
+        """Postpone the queue job if there are too many running jobs"""
+        if not job.queue_job_id or self.env.context.get("queue_job__no_delay"):
+            return
+        for domain, limit in (
+            ([("task_id", "=", self.id)], self.job_max_parallel),
+            (
+                [("task_id.project_id", "=", self.project_id.id)],
+                self.project_id.job_max_parallel,
+            ),
+        ):
+            if not limit:
+                continue
+            running = self.env["sync.job"].search(
+                domain + [("queue_job_id.state", "=", STARTED)]
+            )
+            # Jobs started first keep running, the others are postponed.
+            # The current job may be counted in running jobs too
+            first_started = running.sorted(
+                lambda j: (
+                    j.queue_job_id.date_started or datetime.max,
+                    j.queue_job_id.id,
+                )
+            )[:limit]
+            if job not in first_started and len(running - job) >= limit:
+                raise RetryableJobError(
+                    "Max number of parallel jobs is reached: %s" % limit,
+                    seconds=MAX_PARALLEL_RETRY_DELAY
+                    + random.randint(0, MAX_PARALLEL_RETRY_DELAY),
+                    ignore_retry=True,
+                )
+
+    def _run(self, job, function, calls, raise_on_error=True):
+        self._check_max_parallel(job)
+        log = self.project_id._get_log_function(job, function, log_level=self.log_level)
         try:
             eval_context = self.project_id._get_eval_context(job, log)
-            code = self.code
-            start_time = time.time()
-            result = self._eval(code, function, args, kwargs, eval_context)
-            log(
-                "Executing {}: {:05.3f} sec".format(function, time.time() - start_time),
-                LOG_DEBUG,
-            )
+            # Task code is executed once, even if the function is called many times
+            safe_eval__CACHED(self.code or "", eval_context, mode="exec", nocopy=True)
+            results = []
+            for args, kwargs in calls:
+                start_time = time.time()
+                results.append(self._eval(function, args, kwargs, eval_context))
+                if log.is_enabled(LOG_DEBUG):
+                    log(
+                        "Executing {}: {:05.3f} sec".format(
+                            function, time.time() - start_time
+                        ),
+                        LOG_DEBUG,
+                    )
             log("Job finished")
-            return result, log
+            return results, log
         except Exception:
             buff = StringIO()
             traceback.print_exc(file=buff)
             log(buff.getvalue(), LOG_CRITICAL)
             if raise_on_error:
                 raise
+        finally:
+            log.close()
+            self.project_id._release_eval_context(job)
+
+    def _delay_run_many(self, sub_jobs, function, chunks, **options):
+        """Enqueue ``run_many`` for every sub job in bulk.
+
+        Queue jobs are created with a single ``create()`` call and linked to
+        the sub jobs with a single query.
+        """
+        self.ensure_one()
+        if self.env.context.get("queue_job__no_delay"):
+            for sub_job, chunk in zip(sub_jobs, chunks):
+                self.run_many(sub_job, function, chunk)
+            return
+
+        jobs = [
+            Job(
+                self.run_many,
+                args=(sub_job, function, chunk),
+                **dict(self._get_job_options(), **options),
+            )
+            for sub_job, chunk in zip(sub_jobs, chunks)
+        ]
+        QueueJob = self.env["queue.job"]
+        queue_jobs = (
+            QueueJob.with_context(_job_edit_sentinel=QueueJob.EDIT_SENTINEL)
+            .sudo()
+            .create([j._store_values(create=True) for j in jobs])
+        )
+        self.env.cr.execute(
+            """
+            UPDATE sync_job
+            SET queue_job_id = v.queue_job_id
+            FROM unnest(%s, %s) AS v(id, queue_job_id)
+            WHERE sync_job.id = v.id
+            """,
+            (sub_jobs.ids, queue_jobs.ids),
+        )
+        sub_jobs.invalidate_recordset(["queue_job_id"])
+        sub_jobs.modified(["queue_job_id"])
 
     @api.model
-    def _eval(self, code, function, args, kwargs, eval_context):
+    def _eval(self, function, args, kwargs, eval_context):
+        """Call the function defined by the task code in the eval_context"""
         ARGS = "EXECUTION_ARGS_"
         KWARGS = "EXECUTION_KWARGS_"
         RESULT = "EXECUTION_RESULT_"
 
-        code += """
+        # Task code and the call stub are evaluated separately, so that compiled
+        # code of the task is reused by all jobs (see safe_eval__CACHED)
+        # and executed once per job (see _run)
+        stub = """
 {RESULT} = {function}(*{ARGS}, **{KWARGS})
         """.format(
             RESULT=RESULT, function=function, ARGS=ARGS, KWARGS=KWARGS
@@ -201,9 +343,8 @@ class SyncTask(models.Model):
         eval_context[ARGS] = args or ()
         eval_context[KWARGS] = kwargs or {}
 
-        safe_eval(
-            code, eval_context, mode="exec", nocopy=True
-        )  # nocopy allows to return RESULT
+        # nocopy allows to return RESULT
+        safe_eval__CACHED(stub, eval_context, mode="exec", nocopy=True)
         return eval_context[RESULT]
 
     def name_get(self):
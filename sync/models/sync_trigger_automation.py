@@ -5,7 +5,11 @@ import logging
 
 from odoo import api, fields, models
 
+from odoo.addons.queue_job.job import PENDING
+
 _logger = logging.getLogger(__name__)
+# Key of records to be added to debounced jobs in cr.precommit.data
+DEBOUNCE_DATA_KEY = "sync.trigger.automation.debounce"
 
 
 class SyncTriggerAutomation(models.Model):
@@ -18,6 +22,12 @@ class SyncTriggerAutomation(models.Model):
     automation_id = fields.Many2one(
         "base.automation", delegate=True, required=True, ondelete="cascade"
     )
+    debounce = fields.Integer(
+        "Debounce",
+        help="Number of seconds to wait before starting the job. "
+        "Records of the events within this period are processed by a single job. "
+        "Zero means starting a job for every event.",
+    )
 
     def unlink(self):
         actions = self.mapped("action_server_id")
@@ -37,8 +47,78 @@ class SyncTriggerAutomation(models.Model):
                 )
                 return
 
+            if self.debounce:
+                self._add_debounced_records(records)
+                return
+
             self.sync_task_id.start(self, args=(records,), with_delay=True)
 
+    def _add_debounced_records(self, records):
+        """Collect records of the events until the end of the transaction.
+
+        The pending job is locked and updated right before commit, so the
+        lock is held for as short time as possible.
+        """
+        precommit = self.env.cr.precommit
+        pending = precommit.data.get(DEBOUNCE_DATA_KEY)
+        if pending is None:
+            pending = precommit.data[DEBOUNCE_DATA_KEY] = {}
+            precommit.add(self.browse()._flush_debounced_records)
+        if self.id in pending:
+            records = pending[self.id] | records
+        pending[self.id] = records
+
+    def _flush_debounced_records(self):
+        pending = self.env.cr.precommit.data.pop(DEBOUNCE_DATA_KEY, {})
+        for trigger_id, records in pending.items():
+            trigger = self.browse(trigger_id)
+            if trigger._add_to_pending_job(records):
+                continue
+            trigger.sync_task_id.start(
+                trigger,
+                args=(records,),
+                with_delay=True,
+                delay_options={"eta": trigger.debounce},
+            )
+        # precommit hooks are called after flushing the transaction
+        self.env.flush_all()
+
+    def _add_to_pending_job(self, records):
+        """Merge records into a job of the trigger that is not started yet.
+
+        Returns True if such job is found.
+        """
+        job = self.env["sync.job"].search(
+            [
+                ("trigger_automation_id", "=", self.id),
+                ("queue_job_id.state", "=", PENDING),
+            ],
+            order="id desc",
+            limit=1,
+        )
+        if not job:
+            return False
+        # Prevent the job from being enqueued while it's updated
+        self.env.cr.execute(
+            """
+            SELECT id FROM queue_job
+            WHERE id = %s AND state = %s
+            FOR UPDATE SKIP LOCKED
+            """,
+            (job.queue_job_id.id, PENDING),
+        )
+        if not self.env.cr.fetchone():
+            return False
+
+        queue_job = job.queue_job_id.sudo()
+        queue_job.invalidate_recordset(["args"])
+        # args of SyncTask.run: job, function, (records,)
+        sync_job, function, handler_args = queue_job.args
+        queue_job.with_context(_job_edit_sentinel=queue_job.EDIT_SENTINEL).write(
+            {"args": [sync_job, function, [handler_args[0] | records]]}
+        )
+        return True
+
     def get_code(self):
         return (
             """
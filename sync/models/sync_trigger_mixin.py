@@ -3,6 +3,8 @@
 
 from odoo import api, fields, models
 
+from .sync_job import TRIGGER_MODEL2FIELD
+
 
 class SyncTriggerMixin(models.AbstractModel):
 
@@ -17,8 +19,15 @@ class SyncTriggerMixin(models.AbstractModel):
     job_count = fields.Integer(compute="_compute_job_count")
 
     def _compute_job_count(self):
+        # jobs are linked to the trigger via the field of the specific model
+        field_name = TRIGGER_MODEL2FIELD.get(self._name)
+        counts = (
+            self.env["sync.job"]._read_counts(field_name, self.ids)
+            if field_name
+            else {}
+        )
         for r in self:
-            r.job_count = len(r.job_ids)
+            r.job_count = counts.get(r.id, (0, 0))[0]
 
     def _update_name(self, vals):
         if not ("sync_task_id" in vals or "trigger_name" in vals):
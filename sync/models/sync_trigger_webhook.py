@@ -69,7 +69,8 @@ action = env["sync.trigger.webhook"].browse(%s).start()
                 data, status = result
         else:
             data = result
-        log("Webhook response: {} {}\n{}".format(status, headers, data), LOG_DEBUG)
+        if log.is_enabled(LOG_DEBUG):
+            log("Webhook response: {} {}\n{}".format(status, headers, data), LOG_DEBUG)
         return self.make_response(data, status, headers)
 
     @api.model
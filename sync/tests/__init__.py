@@ -4,3 +4,8 @@ from . import test_property
 from . import test_links
 from . import test_trigger_db
 from . import test_default_value
+from . import test_data
+from . import test_magic_upgrade
+from . import test_job
+from . import test_safe_eval
+from . import test_eval_context
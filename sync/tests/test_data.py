@@ -0,0 +1,58 @@
+# License MIT (https://opensource.org/licenses/MIT).
+import base64
+
+from odoo.tests.common import TransactionCase
+
+CSV_CONTENT = """name,code
+Apple,1
+Banana,2
+Cherry,3
+"""
+
+JSONL_CONTENT = """{"name": "Apple", "code": 1}
+{"name": "Banana", "code": 2}
+
+{"name": "Cherry", "code": 3}
+"""
+
+
+class TestData(TransactionCase):
+    def setUp(self):
+        super(TestData, self).setUp()
+        self.project = self.env["sync.project"].create({"name": "Test Project"})
+
+    def create_data(self, file_name, content):
+        return self.env["sync.data"].create(
+            {
+                "name": file_name.replace(".", "_"),
+                "project_id": self.project.id,
+                "file_name": file_name,
+                "file_content": base64.b64encode(content.encode("utf-8")),
+            }
+        )
+
+    def test_iter_csv(self):
+        data = self.create_data("fruits.csv", CSV_CONTENT)
+        self.assertEqual(data.csv(), list(data.iter_csv()))
+        chunks = list(data.iter_csv(chunk_size=2))
+        self.assertEqual([2, 1], [len(c) for c in chunks])
+        self.assertEqual("Cherry", chunks[1][0]["name"])
+
+    def test_parsed_cache(self):
+        data = self.create_data("fruits.csv", CSV_CONTENT)
+        rows = data.csv()
+        rows[0]["name"] = "Pineapple"
+        rows.append({})
+        # cached value is not affected
+        self.assertEqual("Apple", data.csv()[0]["name"])
+        self.assertEqual(3, len(data.csv()))
+        # cache is not used after update
+        data.file_content = base64.b64encode(b"name,code\nLemon,4\n")
+        self.assertEqual("Lemon", data.csv()[0]["name"])
+
+    def test_iter_jsonl(self):
+        data = self.create_data("fruits.jsonl", JSONL_CONTENT)
+        items = list(data.iter_jsonl())
+        self.assertEqual([1, 2, 3], [item["code"] for item in items])
+        chunks = list(data.iter_jsonl(chunk_size=2))
+        self.assertEqual([2, 1], [len(c) for c in chunks])
@@ -0,0 +1,103 @@
+# License MIT (https://opensource.org/licenses/MIT).
+import threading
+
+from odoo.tests.common import TransactionCase
+
+from ..models.sync_project import EVAL_CONTEXT_SNAPSHOTS
+
+
+class TestEvalContext(TransactionCase):
+    def setUp(self):
+        super(TestEvalContext, self).setUp()
+        self.env = self.env(context=dict(self.env.context, new_cursor_logs=False))
+        self.project = self.env["sync.project"].create(
+            {
+                "name": "Test Project",
+                "eval_context_cache": True,
+                "common_code": "def hello():\n    return 'hello'\n",
+            }
+        )
+        self.param = self.env["sync.project.param"].create(
+            {"project_id": self.project.id, "key": "KEY", "value": "value"}
+        )
+        self.addCleanup(self.project._drop_eval_context_snapshot)
+
+    def _get_eval_context(self, project=None):
+        project = project or self.project
+        job = self.env["sync.job"].create({"function": "test"})
+        log = project._get_log_function(job, "test")
+        return job, project._get_eval_context(job, log)
+
+    def _run(self, project=None):
+        """Evaluation context of a finished job"""
+        project = project or self.project
+        job, eval_context = self._get_eval_context(project)
+        project._release_eval_context(job)
+        return eval_context
+
+    def _touch(self, records):
+        # write_date doesn't change within the test transaction
+        self.env.cr.execute(
+            "UPDATE %s SET write_date = write_date + interval '1 second' "
+            "WHERE id IN %%s" % records._table,
+            (tuple(records.ids),),
+        )
+        records.invalidate_recordset(["write_date"])
+
+    def test_reuse(self):
+        eval_context = self._run()
+        self.assertEqual("hello", eval_context["LIB"].hello())
+        self.assertIs(eval_context["LIB"], self._run()["LIB"])
+
+        # snapshot is kept only when enabled
+        self.project.eval_context_cache = False
+        self.assertIsNot(eval_context["LIB"], self._run()["LIB"])
+
+    def test_invalidate(self):
+        lib = self._run()["LIB"]
+
+        self._touch(self.project)
+        new_lib = self._run()["LIB"]
+        self.assertIsNot(lib, new_lib)
+
+        self._touch(self.param)
+        lib = self._run()["LIB"]
+        self.assertIsNot(new_lib, lib)
+        self.assertIs(lib, self._run()["LIB"])
+
+        # values of the snapshot may depend on the user and the language
+        self.assertTrue(self.project._get_eval_context_snapshot())
+        admin = self.env.ref("base.user_admin")
+        self.assertIsNone(self.project.with_user(admin)._get_eval_context_snapshot())
+        self.env["res.lang"]._activate_lang("fr_FR")
+        project_fr = self.project.with_context(lang="fr_FR")
+        self.assertIsNone(project_fr._get_eval_context_snapshot())
+
+        # updating a parameter in a job drops the snapshot
+        job, eval_context = self._get_eval_context()
+        eval_context["PARAMS"]._update_param("KEY", "new value")
+        self.project._release_eval_context(job)
+        self.assertIsNone(self.project._get_eval_context_snapshot())
+
+    def test_in_use(self):
+        outer_job, outer_context = self._get_eval_context()
+        # nested job in the same thread gets its own snapshot
+        inner_job, inner_context = self._get_eval_context()
+        self.assertIsNot(outer_context["LIB"], inner_context["LIB"])
+        self.project._release_eval_context(inner_job)
+        # the snapshot of the outer job is kept and is still in use
+        self.assertIsNone(self.project._get_eval_context_snapshot())
+
+        self.project._release_eval_context(outer_job)
+        self.assertIs(outer_context["LIB"], self._run()["LIB"])
+
+        # snapshots are not shared between threads
+        snapshots = []
+        thread = threading.Thread(
+            target=lambda: snapshots.append(
+                getattr(EVAL_CONTEXT_SNAPSHOTS, "snapshots", {})
+            )
+        )
+        thread.start()
+        thread.join()
+        self.assertEqual([{}], snapshots)
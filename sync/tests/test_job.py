@@ -0,0 +1,105 @@
+# License MIT (https://opensource.org/licenses/MIT).
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.queue_job.exception import RetryableJobError
+
+from ..models.ir_logging import LOG_ERROR, LOG_WARNING
+from ..models.sync_job import DONE, DONE_WARNING, FAILED
+
+
+class TestJob(TransactionCase):
+    def setUp(self):
+        super(TestJob, self).setUp()
+        self.env = self.env(context=dict(self.env.context, new_cursor_logs=False))
+        self.project = self.env["sync.project"].create({"name": "Test Project"})
+        self.job = self.env["sync.job"].create({"function": "test"})
+        self.log = self.project._get_log_function(self.job, "test")
+
+    def test_state(self):
+        self.log("Hello")
+        # counters are updated on closing the log function
+        self.assertEqual(0, self.job.log_count)
+        self.log.close()
+        self.assertEqual(1, self.job.log_count)
+        self.assertEqual(DONE, self.job.state)
+
+        # logs after closing are counted right away, e.g. the webhook response
+        self.log("Careful", LOG_WARNING)
+        self.assertEqual(DONE_WARNING, self.job.state)
+
+        self.log("Oops", LOG_ERROR)
+        self.assertEqual((3, 1, 1), self._counters())
+        self.assertEqual(FAILED, self.job.state)
+
+        # parent gets state of sub jobs
+        parent = self.env["sync.job"].create({"function": "parent"})
+        self.job.parent_job_id = parent
+        self.assertEqual(FAILED, parent.state)
+
+        self.job.write({"log_count": 0, "error_count": 0, "warning_count": 0})
+        self.job._recount_logs()
+        self.assertEqual((3, 1, 1), self._counters())
+
+    def test_add_jobs(self):
+        task = self.env["sync.task"].create(
+            {
+                "name": "Test Task",
+                "project_id": self.project.id,
+                "code": "log('loaded')\n"
+                "def handle(item):\n"
+                "    log('item: %s' % item)\n",
+            }
+        )
+        self.job.task_id = task
+        env = self.env(context=dict(self.env.context, queue_job__no_delay=False))
+        add_jobs = self.project.with_env(env)._get_eval_context_job_items(
+            self.job, self.log
+        )["add_jobs"]
+        add_jobs("handle", [[i] for i in range(5)], chunk_size=2)
+
+        sub_jobs = self.job.job_ids
+        self.assertEqual(3, len(sub_jobs))
+        self.assertEqual(3, len(sub_jobs.queue_job_id))
+        chunks = []
+        for sub_job in sub_jobs:
+            # args of SyncTask.run_many: job, function, args_list
+            job, function, args_list = sub_job.queue_job_id.args
+            self.assertEqual(sub_job, job)
+            self.assertEqual("handle", function)
+            chunks.append(args_list)
+        self.assertEqual([[[0], [1]], [[2], [3]], [[4]]], sorted(chunks))
+
+        # chunk is executed within one job, task code is evaluated once
+        sub_job = sub_jobs[0]
+        task.run_many(sub_job, "handle", [[0], [1]])
+        messages = sub_job.log_ids.mapped("message")
+        self.assertEqual(1, messages.count("loaded"))
+        self.assertEqual(
+            ["item: 0", "item: 1"], sorted(m for m in messages if "item" in m)
+        )
+
+    def test_max_parallel(self):
+        task = self.env["sync.task"].create(
+            {"name": "Test Task", "project_id": self.project.id, "job_max_parallel": 2}
+        )
+        env = self.env(context=dict(self.env.context, queue_job__no_delay=False))
+        task = task.with_env(env)
+        sub_jobs = env["sync.job"].create([{"function": "handle"}] * 3)
+        task._delay_run_many(sub_jobs, "handle", [[[0]], [[1]], [[2]]])
+        QueueJob = env["queue.job"].with_context(
+            _job_edit_sentinel=env["queue.job"].EDIT_SENTINEL
+        )
+        for i, sub_job in enumerate(sub_jobs):
+            sub_job.task_id = task
+            QueueJob.browse(sub_job.queue_job_id.id).write(
+                {"state": "started", "date_started": "2024-01-01 00:00:0%s" % i}
+            )
+
+        # jobs started first are not postponed
+        task._check_max_parallel(sub_jobs[0])
+        task._check_max_parallel(sub_jobs[1])
+        with self.assertRaises(RetryableJobError):
+            task._check_max_parallel(sub_jobs[2])
+
+    def _counters(self):
+        return self.job.log_count, self.job.error_count, self.job.warning_count
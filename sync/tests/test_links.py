@@ -210,3 +210,146 @@ class TestLink(TransactionCase):
         all_links.unlink()
         all_links = self.search_links(REL, {"github": None, "trello": None})
         self.assertFalse(all_links)
+
+    def _explain_link_search(self, domain):
+        query = self.env["sync.link"]._where_calc(domain)
+        query_str, params = query.select()
+        # the table is too small in tests to use indexes by default
+        self.env.cr.execute("SET LOCAL enable_seqscan = off")
+        self.env.cr.execute("EXPLAIN " + query_str, params)
+        return "\n".join(row[0] for row in self.env.cr.fetchall())
+
+    def test_link_indexes(self):
+        REL = "sync_test_links_indexes"
+        project_id = str(self.env.context["sync_project_id"])
+        plan = self._explain_link_search(
+            [
+                ("relation", "=", REL),
+                ("project_id", "=", project_id),
+                ("system1", "=", "__external__"),
+                ("ref1", "=", "123"),
+            ]
+        )
+        self.assertIn("sync_link_ref1_index", plan)
+        plan = self._explain_link_search(
+            [
+                ("relation", "=", REL),
+                ("project_id", "=", project_id),
+                ("system2", "=", "__odoo__"),
+                ("ref2", "in", ["1", "2", "3"]),
+            ]
+        )
+        self.assertIn("sync_link_ref2_index", plan)
+
+    def test_link_cache(self):
+        REL = "sync_test_links_cache"
+        env = self.env(context=dict(self.env.context, sync_link_cache={}))
+        funcs = env["sync.link"]._get_eval_context()
+        get_link = funcs["get_link"]
+        set_link = funcs["set_link"]
+
+        slink = set_link(REL, {"github": 1, "trello": 101})
+        glink = get_link(REL, {"github": 1, "trello": None})
+        self.assertEqual(slink, glink)
+        with self.assertQueryCount(0):
+            glink = get_link(REL, {"github": 1, "trello": None})
+        self.assertEqual(slink, glink)
+
+        # new link is added to the cache
+        self.assertFalse(get_link(REL, {"github": 2, "trello": None}))
+        slink2 = set_link(REL, {"github": 2, "trello": 102})
+        with self.assertQueryCount(0):
+            glink2 = get_link(REL, {"github": 2, "trello": None})
+        self.assertEqual(slink2, glink2)
+
+        # deleted link is removed from the cache
+        glink2.unlink()
+        self.assertFalse(get_link(REL, {"github": 2, "trello": None}))
+
+    def test_links_many(self):
+        REL = "sync_test_links_many"
+        funcs = self.env["sync.link"]._get_eval_context()
+        get_links_many = funcs["get_links_many"]
+        set_links_many = funcs["set_links_many"]
+
+        # external links
+        links = set_links_many(
+            REL, [{"github": i, "trello": 100 + i} for i in range(5)]
+        )
+        self.assertEqual(5, len(links))
+        res = get_links_many(REL, "github", [0, 1, 2, 42], "trello")
+        self.assertEqual({0, 1, 2}, set(res))
+        self.assertEqual(["101"], res[1].get("trello"))
+        res = get_links_many(REL, "trello", [104], "github")
+        self.assertEqual(["4"], res[104].get("github"))
+
+        # existing links are reused
+        again = set_links_many(REL, [{"github": 1, "trello": 101}])
+        self.assertEqual(links[1], again)
+
+        # same rules as in set_link
+        with self.assertRaises(ValidationError):
+            set_links_many(REL, [{"github": 1, "trello": 1001}])
+        with self.assertRaises(ValidationError):
+            set_links_many(
+                REL, [{"github": 10, "trello": 110}, {"github": 10, "trello": 111}]
+            )
+        set_links_many(
+            REL,
+            [{"github": 1, "trello": 1001}, {"github": 1, "trello": 1002}],
+            allow_many2many=True,
+        )
+        self.assertEqual(3, len(get_links_many(REL, "github", [1], "trello")[1]))
+
+        # odoo links
+        partners = self.env["res.partner"]
+        for _i in range(3):
+            partners |= self.create_record()
+        refs = [generate_ref() for _p in partners]
+        partners.set_links_many(REL, zip(partners, refs))
+        res = partners.get_links_many(REL, refs)
+        self.assertEqual(partners, partners.browse([res[ref].odoo.id for ref in refs]))
+        res = get_links_many(REL, "external", refs[:1])
+        self.assertEqual(partners[0], res[refs[0]].odoo)
+        with self.assertRaises(ValidationError):
+            partners[:1].set_links_many(REL, [(partners[0], generate_ref())])
+
+    def test_sync_x2odoo_chunked_duplicates(self):
+        REL = "sync_test_links_sync_chunked"
+        project = self.env["sync.project"].browse(self.env.context["sync_project_id"])
+
+        def log(*args, **kwargs):
+            pass
+
+        log.is_enabled = lambda level: False
+        link_functions = self.env["sync.link"]._get_eval_context()
+        sync_x2odoo = project._get_sync_functions(log, link_functions)["sync_x2odoo"]
+        sync_info = {
+            "relation": REL,
+            "x": {"get_ref": lambda x: x["ref"]},
+            "odoo": {
+                "create": lambda x: self.env["res.partner"].create({"name": x["name"]}),
+                "update": lambda record, x: record.write({"name": x["name"]}),
+            },
+        }
+        src_list = [
+            {"ref": "a", "name": "A1"},
+            {"ref": "b", "name": "B"},
+            {"ref": "a", "name": "A2"},
+        ]
+        for chunk_size in (None, 10):
+            rel = "%s_%s" % (REL, chunk_size)
+            sync_info["relation"] = rel
+            sync_x2odoo(
+                src_list, sync_info, create=True, update=True, chunk_size=chunk_size
+            )
+            self.assertEqual(self.get_link(rel, "a").odoo.name, "A2")
+            self.assertEqual(self.get_link(rel, "b").odoo.name, "B")
+
+            # reference with many links is an error in both modes
+            partner = self.env["res.partner"].create({"name": "Other"})
+            partner.set_link(rel, "b", allow_many2many=True)
+            with self.assertRaises(ValidationError):
+                sync_x2odoo(
+                    src_list, sync_info, create=True, update=True, chunk_size=chunk_size
+                )
@@ -0,0 +1,150 @@
+# License MIT (https://opensource.org/licenses/MIT).
+import base64
+import io
+import os
+import tempfile
+import zipfile
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests.common import TransactionCase
+from odoo.tools import config
+
+TASK_CODE = '''"""
+TITLE: "Setup"
+MAGIC_BUTTON: "Setup ✨"
+"""
+
+
+def handle_button():
+    log("Hello")
+'''
+
+FILES = {
+    "README.md": "# Test Project",
+    "settings.markdown": "---\nGREETING: Hello\n---\n# Settings",
+    "task.setup.py": TASK_CODE,
+    "data.fruits.csv": "name,code\nApple,1\n",
+}
+
+
+class TestMagicUpgrade(TransactionCase):
+    def setUp(self):
+        super(TestMagicUpgrade, self).setUp()
+        self.project = self.env["sync.project"].create({"name": "Test Project"})
+
+    def upload(self, files):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            for file_name, content in files.items():
+                # archives may keep files in a folder
+                zf.writestr("project/" + file_name, content)
+        self.project.source_file = base64.b64encode(buf.getvalue())
+
+    def test_upgrade_from_archive(self):
+        self.upload(FILES)
+        self.project.magic_upgrade()
+        task = self.project.task_ids
+        self.assertEqual("Setup", task.name)
+        self.assertEqual("Setup ✨", task.magic_button)
+        self.assertEqual([{"name": "Apple", "code": "1"}], self.project.data_ids.csv())
+        self.assertEqual("GREETING", self.project.param_ids.key)
+        self.assertEqual(
+            "Created: 6, Updated: 0, Unchanged: 0, Deleted: 0",
+            self.project.source_upgrade_summary,
+        )
+
+        # nothing changed
+        self.project.magic_upgrade()
+        self.assertEqual(
+            "Created: 0, Updated: 0, Unchanged: 6, Deleted: 0",
+            self.project.source_upgrade_summary,
+        )
+
+        # task is updated, data file is removed
+        files = dict(FILES, **{"task.setup.py": TASK_CODE.replace("Hello", "Hi")})
+        del files["data.fruits.csv"]
+        self.upload(files)
+        self.project.magic_upgrade()
+        self.assertEqual(
+            "Created: 0, Updated: 1, Unchanged: 4, Deleted: 1",
+            self.project.source_upgrade_summary,
+        )
+        self.assertIn("Hi", task.code)
+        # data file is archived, not deleted
+        self.assertFalse(self.project.data_ids)
+        data = self.env["sync.data"]._get_by_xmlid("data.fruits.csv", self.project.id)
+        self.assertTrue(data)
+        self.assertFalse(data.active)
+
+    def test_upgrade_removed_files(self):
+        self.upload(FILES)
+        self.project.magic_upgrade()
+        task = self.project.task_ids
+        data = self.project.data_ids
+
+        files = dict(FILES)
+        del files["task.setup.py"]
+        del files["data.fruits.csv"]
+        self.upload(files)
+        self.project.magic_upgrade()
+        self.assertEqual(
+            "Created: 0, Updated: 0, Unchanged: 4, Deleted: 2",
+            self.project.source_upgrade_summary,
+        )
+        self.assertFalse(task.active)
+        self.assertFalse(data.active)
+
+        # files are added back
+        self.upload(FILES)
+        self.project.magic_upgrade()
+        self.assertEqual(
+            "Created: 2, Updated: 0, Unchanged: 4, Deleted: 0",
+            self.project.source_upgrade_summary,
+        )
+        self.assertTrue(task.active)
+        self.assertTrue(data.active)
+        self.assertEqual(task, self.project.task_ids)
+        self.assertEqual(data, self.project.data_ids)
+
+    def test_upgrade_from_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for file_name, content in FILES.items():
+                with open(os.path.join(tmp, file_name), "w") as f:
+                    f.write(content)
+            self.project.source_url = tmp
+
+            with self.assertRaises(UserError):
+                self.project.magic_upgrade()
+
+            with patch.dict(config.options, {"sync_source_path": tmp}):
+                self.project.magic_upgrade()
+        self.assertEqual("Setup", self.project.task_ids.name)
+        self.assertEqual("fruits", self.project.data_ids.name)
+
+    def test_create_or_update_many_by_xmlid(self):
+        Param = self.env["sync.project.param"]
+        vals_by_code = {
+            key: {
+                "key": key,
+                "url": key.lower(),
+                "project_id": self.project.id,
+            }
+            for key in ("A", "B", "C")
+        }
+        records = Param._create_or_update_many_by_xmlid(vals_by_code, namespace="T")
+        self.assertEqual(records["A"], Param._get_by_xmlid("A", namespace="T"))
+
+        # record with XML ID is deleted
+        records["B"].unlink()
+        # A and C get the same values
+        vals_by_code["A"] = {"url": "new"}
+        vals_by_code["C"] = {"url": "new"}
+        new_records = Param._create_or_update_many_by_xmlid(vals_by_code, namespace="T")
+        self.assertEqual(records["A"], new_records["A"])
+        self.assertEqual(records["C"], new_records["C"])
+        self.assertEqual(new_records["B"], Param._get_by_xmlid("B", namespace="T"))
+        Param.invalidate_model()
+        self.assertEqual("new", new_records["A"].url)
+        self.assertEqual("new", new_records["C"].url)
+        self.assertEqual("b", new_records["B"].url)
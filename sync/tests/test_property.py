@@ -39,3 +39,45 @@ class TestProperty(TransactionCase):
         self.assertAlmostEqual(
             prop_float, 3.14159, places=5, msg="The float property did not match."
         )
+
+    def test_set_many(self):
+        partners = self.partner | self.env["res.partner"].create(
+            [{"name": "Partner 2"}, {"name": "Partner 3"}]
+        )
+        values = dict(zip(partners.ids, [1, 2, 2]))
+        self.env["res.partner"]._set_sync_values("test_many", "integer", values)
+        partners.flush_recordset()
+        self.env.cache.invalidate()
+        self.assertEqual(
+            [1, 2, 2], [p._get_sync_value("test_many", "integer") for p in partners]
+        )
+
+        # Values may be unhashable
+        tag1, tag2 = self.env["res.partner.category"].create(
+            [{"name": "Tag 1"}, {"name": "Tag 2"}]
+        )
+        self.env["ir.model.fields"].create(
+            {
+                "name": self.partner._sync_field_name("test_tags", "many2many"),
+                "ttype": "many2many",
+                "relation": "res.partner.category",
+                "model_id": self.env["ir.model"]._get_id("res.partner"),
+                "field_description": "Test tags",
+            }
+        )
+        values = dict(
+            zip(
+                partners.ids,
+                [[(6, 0, tag1.ids)], [(6, 0, tag1.ids)], [(6, 0, tag2.ids)]],
+            )
+        )
+        self.env["res.partner"]._set_sync_values("test_tags", "many2many", values)
+        self.assertEqual(
+            [tag1, tag1, tag2],
+            [p._get_sync_value("test_tags", "many2many") for p in partners],
+        )
+
+        # Existing field is taken from the registry
+        with self.assertQueryCount(0, flush=False):
+            self.partner._set_sync_value("test_many", "integer", 3)
+        self.assertEqual(3, self.partner._get_sync_value("test_many", "integer"))
@@ -0,0 +1,72 @@
+# License MIT (https://opensource.org/licenses/MIT).
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase
+
+from ..lib.tools import safe_eval as sync_safe_eval
+from ..lib.tools.safe_eval import (
+    clear_code_cache,
+    safe_eval__CACHED,
+    safe_eval__MAGIC__CACHED,
+    test_expr__CACHED,
+)
+
+
+class TestSafeEvalCache(BaseCase):
+    def setUp(self):
+        super(TestSafeEvalCache, self).setUp()
+        clear_code_cache()
+        self.addCleanup(clear_code_cache)
+
+    def test_cache_hit(self):
+        code = "x = 1"
+        with patch.object(
+            sync_safe_eval, "_TEST_EXPR", dict(sync_safe_eval._TEST_EXPR)
+        ) as test_functions:
+            calls = []
+
+            def counted(expr, **kwargs):
+                calls.append(expr)
+                return sync_safe_eval._test_expr__SAFE(expr, **kwargs)
+
+            test_functions["safe"] = counted
+            code_obj = test_expr__CACHED(code, "safe", mode="exec")
+            self.assertIs(code_obj, test_expr__CACHED(code, "safe", mode="exec"))
+            self.assertEqual(1, len(calls))
+
+            # another version of the code gets another key
+            test_expr__CACHED(code + "\n", "safe", mode="exec")
+            self.assertEqual(2, len(calls))
+
+        context = {}
+        safe_eval__CACHED(code, context, mode="exec", nocopy=True)
+        self.assertEqual(1, context["x"])
+
+    def test_filename(self):
+        code_obj = test_expr__CACHED("x = 1", "safe", mode="exec", filename="a")
+        other = test_expr__CACHED("x = 1", "safe", mode="exec", filename="b")
+        self.assertEqual("a", code_obj.co_filename)
+        self.assertEqual("b", other.co_filename)
+
+    def test_lru_eviction(self):
+        with patch.object(sync_safe_eval, "CODE_CACHE_SIZE", 2):
+            first = test_expr__CACHED("1", "safe")
+            second = test_expr__CACHED("2", "safe")
+            # recently used code is kept
+            self.assertIs(first, test_expr__CACHED("1", "safe"))
+            test_expr__CACHED("3", "safe")
+            self.assertIs(first, test_expr__CACHED("1", "safe"))
+            self.assertIsNot(second, test_expr__CACHED("2", "safe"))
+
+    def test_safe_and_magic(self):
+        code = "import json\nx = json.dumps(1)"
+        context = {}
+        safe_eval__MAGIC__CACHED(code, context, mode="exec", nocopy=True)
+        self.assertEqual("1", context["x"])
+        # code validated in magic mode is not reused in safe mode
+        with self.assertRaises(ValueError):
+            safe_eval__CACHED(code, {}, mode="exec", nocopy=True)
+        self.assertIsNot(
+            test_expr__CACHED("x = 1", "safe", mode="exec"),
+            test_expr__CACHED("x = 1", "magic", mode="exec"),
+        )
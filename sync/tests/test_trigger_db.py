@@ -38,3 +38,28 @@ class TestTriggerDB(TransactionCase):
         param = self.env.ref("sync.test_project_param")
         link = self.get_link(param.value, partner.id)
         self.assertTrue(link)
+
+    def test_trigger_db_debounce(self):
+        trigger = self.env.ref("sync.test_trigger_automation")
+        trigger.debounce = 60
+        self.env.ref("sync.test_project").active = True
+        env = self.env(context=dict(self.env.context, queue_job__no_delay=False))
+        partners = env["res.partner"].create(
+            [{"name": "Test Partner 1"}, {"name": "Test Partner 2"}]
+        )
+        partners |= env["res.partner"].create({"name": "Test Partner 3"})
+        # jobs are added right before commit
+        env.cr.flush()
+
+        jobs = env["sync.job"].search([("trigger_automation_id", "=", trigger.id)])
+        self.assertEqual(1, len(jobs))
+        # args of SyncTask.run: job, function, (records,)
+        self.assertEqual(partners, jobs.queue_job_id.args[2][0])
+
+        # records of the next transaction are added to the pending job
+        partners |= env["res.partner"].create({"name": "Test Partner 4"})
+        env.cr.flush()
+        jobs = env["sync.job"].search([("trigger_automation_id", "=", trigger.id)])
+        self.assertEqual(1, len(jobs))
+        jobs.queue_job_id.invalidate_recordset(["args"])
+        self.assertEqual(partners, jobs.queue_job_id.args[2][0])
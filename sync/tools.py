@@ -3,8 +3,14 @@
 import ast
 import base64
 import functools
+import io
 import json
+import os
 import re
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 import markdown
 import requests
@@ -16,6 +22,9 @@ from odoo.tools.translate import _
 
 from .models.ir_logging import LOG_ERROR
 
+HTTP_POOL_MAXSIZE = 8
+_http_pool = None
+
 
 class LogExternalQuery(object):
     """Adds logs before and after external query.
@@ -88,6 +97,44 @@ def remove_front_matter(markdown_content):
         return markdown_content
 
 
+def get_http_pool():
+    """Connection pool shared by all threads of the worker"""
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = urllib3.PoolManager(maxsize=HTTP_POOL_MAXSIZE)
+    return _http_pool
+
+
+def fetch_raw_files(urls, max_workers=HTTP_POOL_MAXSIZE):
+    """
+    Downloads files concurrently.
+
+    Args:
+    urls (list): List of urls to download.
+    max_workers (int): Max number of parallel downloads.
+
+    Returns:
+    dict: A dictionary url -> content bytes.
+
+    Raises:
+    Exception: If any of the files cannot be downloaded.
+    """
+    if not urls:
+        return {}
+    http = get_http_pool()
+
+    def fetch(url):
+        response = http.request("GET", url)
+        if response.status != 200:
+            raise Exception(
+                f"Failed to fetch raw content from {url}. Status code: {response.status}"
+            )
+        return response.data
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        return dict(zip(urls, executor.map(fetch, urls)))
+
+
 def fetch_gist_data(gist_page):
     # https://gist.github.com/yelizariev/e0585a0817c4d87b65b8a3d945da7ca2
     # [0]   [1]     [2]          [3]                 [4]
@@ -106,8 +153,7 @@ def fetch_gist_data(gist_page):
         "Accept": "application/vnd.github.v3+json"
     }
 
-    # Create a connection pool manager
-    http = urllib3.PoolManager()
+    http = get_http_pool()
 
     # Make the GET request to fetch the Gist information
     response = http.request("GET", url, headers=headers)
@@ -120,6 +166,84 @@ def fetch_gist_data(gist_page):
     return gist_content
 
 
+def read_source_files(path=None, archive=None):
+    """
+    Reads project files from a local directory or a zip/tar archive.
+
+    Args:
+    path (str): Path to a directory or an archive on the server.
+    archive (bytes): Content of a zip/tar archive.
+
+    Returns:
+    dict: Data in the format of ``fetch_gist_data``. Besides ``content``, every
+    file has ``raw`` bytes, so nothing is downloaded afterwards.
+
+    Raises:
+    UserError: If the path or the archive cannot be read.
+    """
+    # file name -> (content bytes, modification time)
+    files = {}
+    if path and os.path.isdir(path):
+        for file_name in os.listdir(path):
+            file_path = os.path.join(path, file_name)
+            if file_name.startswith(".") or not os.path.isfile(file_path):
+                continue
+            with open(file_path, "rb") as f:
+                files[file_name] = (
+                    f.read(),
+                    datetime.utcfromtimestamp(os.path.getmtime(file_path)),
+                )
+    else:
+        if path:
+            if not os.path.isfile(path):
+                raise UserError(_("File or directory %s is not found") % path)
+            with open(path, "rb") as f:
+                archive = f.read()
+        files = _read_archive(archive)
+
+    updated_at = max((mtime for _content, mtime in files.values()), default=None)
+    return {
+        "updated_at": (updated_at or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "files": {
+            file_name: {
+                "filename": file_name,
+                "content": content.decode("utf-8", errors="replace"),
+                "raw": content,
+            }
+            for file_name, (content, _mtime) in files.items()
+        },
+    }
+
+
+def _read_archive(archive):
+    # Files are flat in the project, but archives may put them into a folder,
+    # e.g. "<gist_id>-main/task.setup.py"
+    files = {}
+    if zipfile.is_zipfile(io.BytesIO(archive)):
+        with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+            for info in zf.infolist():
+                file_name = os.path.basename(info.filename)
+                if info.is_dir() or not file_name or file_name.startswith("."):
+                    continue
+                files[file_name] = (zf.read(info), datetime(*info.date_time))
+        return files
+
+    try:
+        tf = tarfile.open(fileobj=io.BytesIO(archive), mode="r:*")
+    except tarfile.TarError as err:
+        raise UserError(_("Source must be a zip or tar archive")) from err
+    with tf:
+        for member in tf.getmembers():
+            file_name = os.path.basename(member.name)
+            if not member.isfile() or file_name.startswith("."):
+                continue
+            files[file_name] = (
+                tf.extractfile(member).read(),
+                datetime.utcfromtimestamp(member.mtime),
+            )
+    return files
+
+
 def extract_yaml(content, pattern, missing_message="No YAML front matter found."):
     """
     Extracts and parses YAML front matter using the given regex pattern.